@@ -4,23 +4,31 @@ Structured prompts for poll generation, option suggestions, and
 poll improvement across all AI providers (Gemini, OpenAI, Claude, Ollama).
 """
 
-from typing import List
+from functools import lru_cache
+from typing import Sequence, Tuple
 
 
+STYLE_INSTRUCTIONS = {
+    'neutral': 'Keep the tone neutral and balanced.',
+    'fun': 'Make it fun, casual, and engaging with emojis.',
+    'professional': 'Use professional, formal language.',
+    'educational': 'Make it educational and informative.'
+}
+
+
+def _bullet_list(items: Tuple[str, ...]) -> str:
+    """Format items as a markdown bullet list with a single join."""
+    return "- " + "\n- ".join(items) if items else ""
+
+
+@lru_cache(maxsize=256)
 def get_generation_prompt(topic: str, num_options: int, style: str) -> str:
     """Get the prompt for poll generation."""
-    style_instructions = {
-        'neutral': 'Keep the tone neutral and balanced.',
-        'fun': 'Make it fun, casual, and engaging with emojis.',
-        'professional': 'Use professional, formal language.',
-        'educational': 'Make it educational and informative.'
-    }
-    
     return f"""Generate a poll based on this topic: "{topic}"
 
 Requirements:
 - Create exactly {num_options} answer options
-- {style_instructions.get(style, style_instructions['neutral'])}
+- {STYLE_INSTRUCTIONS.get(style, STYLE_INSTRUCTIONS['neutral'])}
 - Make the question clear and engaging
 - Options should be distinct and cover different perspectives
 - Keep options concise (under 100 characters each)
@@ -34,10 +42,10 @@ Return ONLY a JSON object in this exact format:
 Do not include any other text, only the JSON object."""
 
 
-def get_new_options_prompt(question: str, existing_options: List[str], num_options: int = 4) -> str:
-    """Get the prompt for suggesting new poll options that don't already exist."""
-    existing_text = "\n".join(f"- {opt}" for opt in existing_options)
-    
+@lru_cache(maxsize=256)
+def _new_options_prompt(question: str, existing_options: Tuple[str, ...], num_options: int) -> str:
+    existing_text = _bullet_list(existing_options)
+
     return f"""Given this poll question: "{question}"
 
 These options already exist:
@@ -56,10 +64,10 @@ Return ONLY a JSON object in this exact format:
 Do not include any other text, only the JSON object."""
 
 
-def get_suggestion_prompt(question: str, options: List[str]) -> str:
-    """Get the prompt for poll suggestions."""
-    options_text = "\n".join(f"- {opt}" for opt in options)
-    
+@lru_cache(maxsize=256)
+def _suggestion_prompt(question: str, options: Tuple[str, ...]) -> str:
+    options_text = _bullet_list(options)
+
     return f"""Analyze this poll and suggest improvements:
 
 Question: {question}
@@ -81,3 +89,13 @@ Return ONLY a JSON object in this exact format:
 }}
 
 Do not include any other text, only the JSON object."""
+
+
+def get_new_options_prompt(question: str, existing_options: Sequence[str], num_options: int = 4) -> str:
+    """Get the prompt for suggesting new poll options that don't already exist."""
+    return _new_options_prompt(question, tuple(map(str, existing_options)), num_options)
+
+
+def get_suggestion_prompt(question: str, options: Sequence[str]) -> str:
+    """Get the prompt for poll suggestions."""
+    return _suggestion_prompt(question, tuple(map(str, options)))
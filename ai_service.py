@@ -4,20 +4,170 @@ Multi-provider AI integration for poll generation and suggestions.
 Supports: Google Gemini, OpenAI, Anthropic Claude
 """
 
+import copy
+import hashlib
 import json
 import logging
+import random
 import re
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
 from typing import Optional, Dict, List, Any
 import requests
+from requests.adapters import HTTPAdapter
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+from urllib3.util.retry import Retry
 import ai_prompts
 
 logger = logging.getLogger(__name__)
 
+def _json_dumps(data: Any) -> bytes:
+    """Serialize a request body, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _json_loads(raw):
+    """
+    Parse JSON text or bytes, using orjson when available.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    can keep catching the stdlib exception.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Static request headers shared by every provider
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+ANTHROPIC_VERSION = '2023-06-01'
+
+
+class _JitteredRetry(Retry):
+    """
+    Retry with random jitter on every backoff and a capped Retry-After.
+    Overrides only hooks that urllib3 1.x and 2.x share (backoff_jitter is 2.x only),
+    so a fleet of workers does not retry a 429 in lockstep and a provider's
+    throttle hint is honoured without blocking a worker for minutes.
+    """
+    RETRY_AFTER_MAX = 4.0
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, self.backoff_factor)
+
+    def sleep_for_retry(self, response=None) -> bool:
+        retry_after = self.get_retry_after(response) if response is not None else None
+        if retry_after:
+            time.sleep(min(retry_after, self.RETRY_AFTER_MAX))
+            return True
+        return False
+
+
+# Retry policy for transient provider failures (rate limits and 5xx).
+# Read timeouts are not retried so a slow provider can't multiply the 30s budget;
+# each wait is the Retry-After hint (capped at 4s) or 0.5s..4s backoff plus jitter.
+_RETRY_POLICY = _JitteredRetry(
+    total=4,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['POST', 'GET'],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# Precompiled pattern for stripping markdown code fences from model output
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+
+
+def _balanced_object_end(text: str, start: int) -> int:
+    """
+    Return the index just past the {...} object opening at text[start], or -1.
+    Tracks brace depth with a string/escape-aware scan so braces inside
+    JSON strings are ignored and trailing chatter is never copied.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def _extract_json_object(text: str) -> Optional[Any]:
+    """
+    Parse the first balanced {...} object in text that is valid JSON, or None.
+    A candidate that fails to parse (e.g. a stray "{your}" in the model's
+    preamble) resumes the scan from the next '{'.
+    """
+    start = text.find('{')
+    while start != -1:
+        end = _balanced_object_end(text, start)
+        if end != -1:
+            try:
+                return _json_loads(text[start:end])
+            except json.JSONDecodeError:
+                pass
+        start = text.find('{', start + 1)
+    return None
+
 
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
     
+    @staticmethod
+    def create_session() -> requests.Session:
+        """
+        Create a pooled HTTP session so keep-alive connections are reused across calls.
+        The session carries no credentials and stores no cookies, so it can be
+        shared between providers and users; auth headers are sent per request.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY_POLICY)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def _init_session(self, http: Optional[requests.Session]) -> None:
+        """Use the shared session if given, otherwise own a private one."""
+        self._owns_session = http is None
+        self.session = http if http is not None else self.create_session()
+
+    def close(self) -> None:
+        """Close the underlying HTTP session if this provider owns it."""
+        session = getattr(self, 'session', None)
+        if session is not None and getattr(self, '_owns_session', False):
+            session.close()
+
+    def __del__(self):
+        self.close()
+
     @abstractmethod
     def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
         """Generate a poll question and options from a topic."""
@@ -33,43 +183,34 @@ class AIProvider(ABC):
         """Test if the API connection is working."""
         pass
     
-    def _get_generation_prompt(self, topic: str, num_options: int, style: str) -> str:
-        """Get the prompt for poll generation."""
-        return ai_prompts.get_generation_prompt(topic, num_options, style)
-
-    def _get_suggestion_prompt(self, question: str, options: List[str]) -> str:
-        """Get the prompt for poll suggestions."""
-        return ai_prompts.get_suggestion_prompt(question, options)
-
-    def _get_new_options_prompt(self, question: str, existing_options: List[str], num_options: int = 4) -> str:
-        """Get the prompt for suggesting new poll options."""
-        return ai_prompts.get_new_options_prompt(question, existing_options, num_options)
-
     def suggest_new_options(self, question: str, existing_options: List[str], num_options: int = 4) -> Dict[str, Any]:
         """Suggest new options for an existing poll. Default implementation uses generate_poll."""
         raise NotImplementedError("Subclasses should implement suggest_new_options")
 
-    def _parse_json_response(self, response: str) -> Dict[str, Any]:
-        """Parse JSON from AI response, handling common formatting issues."""
-        # Try to find JSON in the response
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
+    def _parse_json_response(self, response: str, structured: bool = False) -> Dict[str, Any]:
+        """
+        Parse JSON from AI response, handling common formatting issues.
+        Pass structured=True when the provider was asked for JSON output
+        (JSON mime type / response_format); the response is then parsed
+        directly without any extraction or fence stripping.
+        """
+        # Fast path: JSON-mode providers usually return a bare JSON document
+        try:
+            return _json_loads(response)
+        except json.JSONDecodeError as e:
+            if structured:
+                raise ValueError(f"Failed to parse AI response as JSON: {e}")
+
+        # Try to find the first balanced JSON object in the response
+        parsed = _extract_json_object(response)
+        if parsed is not None:
+            return parsed
         
-        # Try cleaning up the response
-        cleaned = response.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        if cleaned.startswith('```'):
-            cleaned = cleaned[3:]
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
+        # Try cleaning up the response (strip markdown code fences)
+        cleaned = _FENCE_RE.sub('', response.strip())
         
         try:
-            return json.loads(cleaned.strip())
+            return _json_loads(cleaned.strip())
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse AI response as JSON: {e}")
 
@@ -84,10 +225,15 @@ class GeminiProvider(AIProvider):
     # - gemini-3-pro: Most intelligent, multimodal understanding
     # - gemini-2.5-flash-lite: Ultra-fast, cost-efficient
     
-    def __init__(self, api_key: str, model: str = 'gemini-2.5-flash'):
+    def __init__(self, api_key: str, model: str = 'gemini-2.5-flash',
+                 http: Optional[requests.Session] = None):
         self.api_key = api_key
         self.model = model
         self.base_url = 'https://generativelanguage.googleapis.com/v1beta'
+        self._generate_url = f"{self.base_url}/models/{self.model}:generateContent"
+        self._test_url = f"{self.base_url}/models/{self.model}"
+        self._headers = _JSON_HEADERS
+        self._init_session(http)
 
     def _extract_response_text(self, result: Dict) -> str:
         """
@@ -97,88 +243,54 @@ class GeminiProvider(AIProvider):
         - the final part              → actual JSON response
         """
         parts = result['candidates'][0]['content']['parts']
+        # Non-thinking models return a single part
+        if len(parts) == 1:
+            return parts[0]['text']
         # Return the last non-thought part (the actual answer)
-        for part in reversed(parts):
-            if not part.get('thought', False):
+        for i in range(len(parts) - 1, -1, -1):
+            part = parts[i]
+            if not part.get('thought'):
                 return part['text']
         # Fallback: return last part regardless
         return parts[-1]['text']
 
-    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
-        prompt = self._get_generation_prompt(topic, num_options, style)
-        
-        url = f"{self.base_url}/models/{self.model}:generateContent"
-        headers = {'Content-Type': 'application/json'}
+    def _call(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Send a JSON-mode generateContent request and return the answer text."""
         params = {'key': self.api_key}
         
         data = {
             'contents': [{'parts': [{'text': prompt}]}],
             'generationConfig': {
-                'temperature': 0.7,
-                'maxOutputTokens': 8196,
+                'temperature': temperature,
+                'maxOutputTokens': max_tokens,
                 'responseMimeType': 'application/json'
             }
         }
         
-        response = requests.post(url, headers=headers, params=params, json=data, timeout=30)
+        response = self.session.post(self._generate_url, headers=self._headers, params=params,
+                                     data=_json_dumps(data), timeout=30)
         response.raise_for_status()
         
-        result = response.json()
-        text = self._extract_response_text(result)
-        return self._parse_json_response(text)
+        result = _json_loads(response.content)
+        return self._extract_response_text(result)
+
+    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
+        prompt = ai_prompts.get_generation_prompt(topic, num_options, style)
+        return self._parse_json_response(self._call(prompt, 0.7, 8196), structured=True)
     
     def suggest_new_options(self, question: str, existing_options: List[str], num_options: int = 4) -> Dict[str, Any]:
-        prompt = self._get_new_options_prompt(question, existing_options, num_options)
-        
-        url = f"{self.base_url}/models/{self.model}:generateContent"
-        headers = {'Content-Type': 'application/json'}
-        params = {'key': self.api_key}
-        
-        data = {
-            'contents': [{'parts': [{'text': prompt}]}],
-            'generationConfig': {
-                'temperature': 0.8,
-                'maxOutputTokens': 1024,
-                'responseMimeType': 'application/json'
-            }
-        }
-        
-        response = requests.post(url, headers=headers, params=params, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = self._extract_response_text(result)
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_new_options_prompt(question, existing_options, num_options)
+        return self._parse_json_response(self._call(prompt, 0.8, 1024), structured=True)
 
     def suggest_improvements(self, question: str, options: List[str]) -> Dict[str, Any]:
-        prompt = self._get_suggestion_prompt(question, options)
-        
-        url = f"{self.base_url}/models/{self.model}:generateContent"
-        headers = {'Content-Type': 'application/json'}
-        params = {'key': self.api_key}
-        
-        data = {
-            'contents': [{'parts': [{'text': prompt}]}],
-            'generationConfig': {
-                'temperature': 0.5,
-                'maxOutputTokens': 4096,
-                'responseMimeType': 'application/json'
-            }
-        }
-        
-        response = requests.post(url, headers=headers, params=params, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = self._extract_response_text(result)
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_suggestion_prompt(question, options)
+        return self._parse_json_response(self._call(prompt, 0.5, 4096), structured=True)
     
     def test_connection(self) -> bool:
-        url = f"{self.base_url}/models/{self.model}"
         params = {'key': self.api_key}
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(self._test_url, headers=self._headers, params=params, timeout=10)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"Gemini connection test failed: {e}")
@@ -196,98 +308,56 @@ class OpenAIProvider(AIProvider):
     # - gpt-4o: Fast, intelligent, flexible
     # - gpt-4o-mini: Affordable small model
     
-    def __init__(self, api_key: str, model: str = 'gpt-4.1'):
+    def __init__(self, api_key: str, model: str = 'gpt-4.1',
+                 http: Optional[requests.Session] = None):
         self.api_key = api_key
         self.model = model
         self.base_url = 'https://api.openai.com/v1'
+        self._chat_url = f"{self.base_url}/chat/completions"
+        self._models_url = f"{self.base_url}/models"
+        self._headers = {**_JSON_HEADERS, 'Authorization': f'Bearer {api_key}'}
+        self._init_session(http)
     
-    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
-        prompt = self._get_generation_prompt(topic, num_options, style)
-        
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self.api_key}'
-        }
-        
+    def _call(self, prompt: str, temperature: float, max_tokens: int, system_prompt: str) -> str:
+        """Send a JSON-mode chat completion request and return the answer text."""
         data = {
             'model': self.model,
             'messages': [
-                {'role': 'system', 'content': 'You are a helpful assistant that generates poll questions. Always respond with valid JSON only.'},
+                {'role': 'system', 'content': system_prompt},
                 {'role': 'user', 'content': prompt}
             ],
-            'temperature': 0.7,
-            'max_tokens': 8196,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
             'response_format': {'type': 'json_object'}
         }
         
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = self.session.post(self._chat_url, headers=self._headers, data=_json_dumps(data), timeout=30)
         response.raise_for_status()
         
-        result = response.json()
-        text = result['choices'][0]['message']['content']
-        return self._parse_json_response(text)
+        result = _json_loads(response.content)
+        return result['choices'][0]['message']['content']
+
+    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
+        prompt = ai_prompts.get_generation_prompt(topic, num_options, style)
+        text = self._call(prompt, 0.7, 8196,
+                          'You are a helpful assistant that generates poll questions. Always respond with valid JSON only.')
+        return self._parse_json_response(text, structured=True)
     
     def suggest_improvements(self, question: str, options: List[str]) -> Dict[str, Any]:
-        prompt = self._get_suggestion_prompt(question, options)
-        
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self.api_key}'
-        }
-        
-        data = {
-            'model': self.model,
-            'messages': [
-                {'role': 'system', 'content': 'You are a helpful assistant that improves poll questions. Always respond with valid JSON only.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0.5,
-            'max_tokens': 4096,
-            'response_format': {'type': 'json_object'}
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['choices'][0]['message']['content']
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_suggestion_prompt(question, options)
+        text = self._call(prompt, 0.5, 4096,
+                          'You are a helpful assistant that improves poll questions. Always respond with valid JSON only.')
+        return self._parse_json_response(text, structured=True)
 
     def suggest_new_options(self, question: str, existing_options: List[str], num_options: int = 4) -> Dict[str, Any]:
-        prompt = self._get_new_options_prompt(question, existing_options, num_options)
-        
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self.api_key}'
-        }
-        
-        data = {
-            'model': self.model,
-            'messages': [
-                {'role': 'system', 'content': 'You are a helpful assistant that suggests poll options. Always respond with valid JSON only.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0.8,
-            'max_tokens': 8196,
-            'response_format': {'type': 'json_object'}
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['choices'][0]['message']['content']
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_new_options_prompt(question, existing_options, num_options)
+        text = self._call(prompt, 0.8, 8196,
+                          'You are a helpful assistant that suggests poll options. Always respond with valid JSON only.')
+        return self._parse_json_response(text, structured=True)
 
     def test_connection(self) -> bool:
-        url = f"{self.base_url}/models"
-        headers = {'Authorization': f'Bearer {self.api_key}'}
-        
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(self._models_url, headers=self._headers, timeout=10)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"OpenAI connection test failed: {e}")
@@ -302,89 +372,43 @@ class ClaudeProvider(AIProvider):
     # - claude-sonnet-4-5: Best speed & intelligence balance
     # - claude-haiku-4-5: Fastest, near-frontier intelligence
     
-    def __init__(self, api_key: str, model: str = 'claude-sonnet-4-5'):
+    def __init__(self, api_key: str, model: str = 'claude-sonnet-4-5',
+                 http: Optional[requests.Session] = None):
         self.api_key = api_key
         self.model = model
         self.base_url = 'https://api.anthropic.com/v1'
-    
-    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
-        prompt = self._get_generation_prompt(topic, num_options, style)
-        
-        url = f"{self.base_url}/messages"
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': self.api_key,
-            'anthropic-version': '2023-06-01'
-        }
-        
+        self._messages_url = f"{self.base_url}/messages"
+        self._headers = {**_JSON_HEADERS, 'x-api-key': api_key, 'anthropic-version': ANTHROPIC_VERSION}
+        self._init_session(http)
+
+    def _call(self, prompt: str, max_tokens: int) -> str:
+        """Send a messages request and return the answer text."""
         data = {
             'model': self.model,
-            'max_tokens': 8196,
+            'max_tokens': max_tokens,
             'messages': [{'role': 'user', 'content': prompt}]
         }
         
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = self.session.post(self._messages_url, headers=self._headers, data=_json_dumps(data), timeout=30)
         response.raise_for_status()
         
-        result = response.json()
-        text = result['content'][0]['text']
-        return self._parse_json_response(text)
+        result = _json_loads(response.content)
+        return result['content'][0]['text']
+
+    def generate_poll(self, topic: str, num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
+        prompt = ai_prompts.get_generation_prompt(topic, num_options, style)
+        return self._parse_json_response(self._call(prompt, 8196))
     
     def suggest_improvements(self, question: str, options: List[str]) -> Dict[str, Any]:
-        prompt = self._get_suggestion_prompt(question, options)
-        
-        url = f"{self.base_url}/messages"
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': self.api_key,
-            'anthropic-version': '2023-06-01'
-        }
-        
-        data = {
-            'model': self.model,
-            'max_tokens': 4096,
-            'messages': [{'role': 'user', 'content': prompt}]
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['content'][0]['text']
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_suggestion_prompt(question, options)
+        return self._parse_json_response(self._call(prompt, 4096))
 
     def suggest_new_options(self, question: str, existing_options: List[str], num_options: int = 4) -> Dict[str, Any]:
-        prompt = self._get_new_options_prompt(question, existing_options, num_options)
-        
-        url = f"{self.base_url}/messages"
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': self.api_key,
-            'anthropic-version': '2023-06-01'
-        }
-        
-        data = {
-            'model': self.model,
-            'max_tokens': 4096,
-            'messages': [{'role': 'user', 'content': prompt}]
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        text = result['content'][0]['text']
-        return self._parse_json_response(text)
+        prompt = ai_prompts.get_new_options_prompt(question, existing_options, num_options)
+        return self._parse_json_response(self._call(prompt, 4096))
 
     def test_connection(self) -> bool:
         # Claude doesn't have a simple test endpoint, so we try a minimal request
-        url = f"{self.base_url}/messages"
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': self.api_key,
-            'anthropic-version': '2023-06-01'
-        }
-        
         data = {
             'model': self.model,
             'max_tokens': 10,
@@ -392,13 +416,82 @@ class ClaudeProvider(AIProvider):
         }
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = self.session.post(self._messages_url, headers=self._headers, data=_json_dumps(data), timeout=10)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"Claude connection test failed: {e}")
             return False
 
 
+class ResponseCache:
+    """
+    Small thread-safe TTL + LRU cache for parsed AI responses.
+    Identical requests skip the provider round trip (and its token cost).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a compact cache key from the request parts."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# Shared across AIService instances, which are created per request
+_response_cache = ResponseCache()
+
+# Large suggest_new_options requests are split into parallel batches of this size
+NEW_OPTIONS_FAN_OUT_THRESHOLD = 6
+NEW_OPTIONS_BATCH_SIZE = 4
+
+# Static provider metadata, in display order
+_PROVIDER_META = (
+    {
+        'id': 'gemini',
+        'name': 'Google Gemini',
+        'models': ('gemini-2.5-flash', 'gemini-2.5-pro', 'gemini-3-flash', 'gemini-3-pro', 'gemini-2.5-flash-lite')
+    },
+    {
+        'id': 'openai',
+        'name': 'OpenAI',
+        'models': ('gpt-5.2', 'gpt-5-mini', 'gpt-5-nano', 'gpt-4.1', 'gpt-4.1-mini', 'gpt-4o', 'gpt-4o-mini')
+    },
+    {
+        'id': 'claude',
+        'name': 'Anthropic Claude',
+        'models': ('claude-opus-4-6', 'claude-sonnet-4-5', 'claude-haiku-4-5')
+    },
+)
+
+
 class AIService:
     """Main AI service that manages providers and handles requests."""
     
@@ -407,10 +500,22 @@ class AIService:
         'openai': OpenAIProvider,
         'claude': ClaudeProvider
     }
+
+    # One pooled session per process, shared by every service instance so
+    # keep-alive connections survive across requests and users
+    _http = AIProvider.create_session()
     
     def __init__(self, user=None, secret_key: str = None):
         self.user = user
         self.secret_key = secret_key
+        self._keys: Optional[Dict[str, str]] = None
+        self._provider_cache: Dict[tuple, AIProvider] = {}
+
+    def _get_keys(self) -> Dict[str, str]:
+        """Decrypt the user's API keys once per service instance."""
+        if self._keys is None:
+            self._keys = self.user.get_api_keys(self.secret_key)
+        return self._keys
 
     def get_provider(self, provider_name: str) -> Optional[AIProvider]:
         """Get an initialized provider for the user."""
@@ -420,48 +525,109 @@ class AIService:
         if not self.user or not self.secret_key:
             raise ValueError("User authentication required for AI features")
         
-        keys = self.user.get_api_keys(self.secret_key)
+        keys = self._get_keys()
         
         if provider_name == 'gemini':
             key = keys.get('gemini')
             if not key:
                 raise ValueError("Gemini API key not configured")
             model = keys.get('gemini_model', 'gemini-2.5-flash')
-            return GeminiProvider(key, model=model)
         
         elif provider_name == 'openai':
             key = keys.get('openai')
             if not key:
                 raise ValueError("OpenAI API key not configured")
             model = keys.get('openai_model', 'gpt-4.1')
-            return OpenAIProvider(key, model=model)
         
         elif provider_name == 'claude':
             key = keys.get('claude')
             if not key:
                 raise ValueError("Claude API key not configured")
             model = keys.get('claude_model', 'claude-sonnet-4-5')
-            return ClaudeProvider(key, model=model)
         
-        return None
+        else:
+            return None
+        
+        # Reuse the provider for the same model; this instance only ever holds
+        # one user's keys (decrypted once), so the key itself needs no part in it
+        cache_key = (provider_name, model)
+        provider = self._provider_cache.get(cache_key)
+        if provider is None:
+            provider = self.PROVIDERS[provider_name](key, model=model, http=AIService._http)
+            self._provider_cache[cache_key] = provider
+        return provider
     
-    def generate_poll(self, provider_name: str, topic: str, 
-                      num_options: int = 4, style: str = 'neutral') -> Dict[str, Any]:
-        """Generate a poll using the specified provider."""
+    def _cached_call(self, provider_name: str, method: str, *args, fetch=None,
+                     refresh: bool = False) -> Dict[str, Any]:
+        """
+        Call a provider method, reusing a cached response for identical input.
+        refresh skips the lookup (e.g. "Regenerate") and stores the new result.
+        fetch optionally replaces the direct provider call; it receives the
+        provider followed by args. Callers get a copy, never the cached entry.
+        """
         provider = self.get_provider(provider_name)
-        return provider.generate_poll(topic, num_options, style)
+        # Scope entries per user so responses are never shared across accounts
+        key = ResponseCache.make_key(getattr(self.user, 'id', None), provider_name,
+                                     provider.model, method, args)
+        if not refresh:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                logger.debug(f"AI response cache hit for {provider_name}.{method}")
+                return copy.deepcopy(cached)
+        if fetch is None:
+            result = getattr(provider, method)(*args)
+        else:
+            result = fetch(provider, *args)
+        _response_cache.set(key, copy.deepcopy(result))
+        return result
+
+    @staticmethod
+    def _fan_out_new_options(provider: AIProvider, question: str,
+                             existing_options: List[str], num_options: int) -> Dict[str, Any]:
+        """
+        Request a large number of new options as parallel smaller batches,
+        then merge them in batch order with case-insensitive de-duplication.
+        """
+        sizes = [min(NEW_OPTIONS_BATCH_SIZE, num_options - i)
+                 for i in range(0, num_options, NEW_OPTIONS_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(4, len(sizes))) as executor:
+            batches = list(executor.map(
+                lambda n: provider.suggest_new_options(question, existing_options, n), sizes))
+
+        merged = {}
+        for batch in batches:
+            for option in batch.get('options', []):
+                if isinstance(option, str):
+                    merged.setdefault(option.lower(), option)
+        return {'options': list(merged.values())[:num_options]}
+
+    def generate_poll(self, provider_name: str, topic: str, 
+                      num_options: int = 4, style: str = 'neutral',
+                      refresh: bool = False) -> Dict[str, Any]:
+        """Generate a poll using the specified provider (refresh bypasses the cache)."""
+        return self._cached_call(provider_name, 'generate_poll', topic, num_options, style,
+                                 refresh=refresh)
     
     def suggest_improvements(self, provider_name: str, 
-                            question: str, options: List[str]) -> Dict[str, Any]:
-        """Get AI suggestions for improving a poll."""
-        provider = self.get_provider(provider_name)
-        return provider.suggest_improvements(question, options)
+                            question: str, options: List[str],
+                            refresh: bool = False) -> Dict[str, Any]:
+        """Get AI suggestions for improving a poll (refresh bypasses the cache)."""
+        return self._cached_call(provider_name, 'suggest_improvements', question, options,
+                                 refresh=refresh)
 
     def suggest_new_options(self, provider_name: str, question: str,
-                           existing_options: List[str], num_options: int = 4) -> Dict[str, Any]:
-        """Suggest new options for an existing poll that don't duplicate existing ones."""
-        provider = self.get_provider(provider_name)
-        return provider.suggest_new_options(question, existing_options, num_options)
+                           existing_options: List[str], num_options: int = 4,
+                           refresh: bool = False) -> Dict[str, Any]:
+        """
+        Suggest new options for an existing poll that don't duplicate existing ones
+        (refresh bypasses the cache).
+        """
+        fetch = None
+        if num_options > NEW_OPTIONS_FAN_OUT_THRESHOLD:
+            fetch = self._fan_out_new_options
+        return self._cached_call(provider_name, 'suggest_new_options',
+                                 question, existing_options, num_options, fetch=fetch,
+                                 refresh=refresh)
 
     def test_provider(self, provider_name: str) -> bool:
         """Test if a provider is properly configured and working."""
@@ -477,31 +643,9 @@ class AIService:
         if not self.user or not self.secret_key:
             return []
         
-        keys = self.user.get_api_keys(self.secret_key)
-        providers = []
-        
-        if keys.get('gemini'):
-            providers.append({
-                'id': 'gemini',
-                'name': 'Google Gemini',
-                'configured': True,
-                'models': ['gemini-2.5-flash', 'gemini-2.5-pro', 'gemini-3-flash', 'gemini-3-pro', 'gemini-2.5-flash-lite']
-            })
-        
-        if keys.get('openai'):
-            providers.append({
-                'id': 'openai',
-                'name': 'OpenAI',
-                'configured': True,
-                'models': ['gpt-5.2', 'gpt-5-mini', 'gpt-5-nano', 'gpt-4.1', 'gpt-4.1-mini', 'gpt-4o', 'gpt-4o-mini']
-            })
-        
-        if keys.get('claude'):
-            providers.append({
-                'id': 'claude',
-                'name': 'Anthropic Claude',
-                'configured': True,
-                'models': ['claude-opus-4-6', 'claude-sonnet-4-5', 'claude-haiku-4-5']
-            })
-        
-        return providers
+        keys = self._get_keys()
+        return [
+            {'id': meta['id'], 'name': meta['name'], 'configured': True, 'models': list(meta['models'])}
+            for meta in _PROVIDER_META
+            if keys.get(meta['id'])
+        ]
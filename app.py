@@ -8,22 +8,32 @@ and error handlers. Loads configuration from environment variables.
 from dotenv import load_dotenv
 load_dotenv()
 
+import functools
 import os
-from flask import Flask, session, request, render_template, jsonify
+from datetime import datetime, timezone
+from flask import Flask, session, request, render_template, jsonify, g
+from flask_migrate import stamp as migrate_stamp
+from sqlalchemy import inspect as sa_inspect
 import logging
 
-from config import config
+from config import config, FLASK_ENV
 from services.config_validation import validate_config
 from extensions import db, migrate, csrf, login_manager, limiter, cache
 from models import User
+from encryption import get_encryption
 from utils import generate_session_id, format_time_remaining
 
 # Validate required env vars before anything else
 validate_config()
 
+# FLASK_ENV is read once in config; unset means production config without
+# the explicit-production extras (HSTS)
+IS_DEV = FLASK_ENV == 'development'
+IS_PROD = FLASK_ENV == 'production'
+
 # Initialize Flask app
 app = Flask(__name__)
-app.config.from_object(config[os.getenv('FLASK_ENV', 'production')])
+app.config.from_object(config[FLASK_ENV or 'production'])
 
 # Initialize extensions
 db.init_app(app)
@@ -36,18 +46,50 @@ login_manager.login_message_category = 'info'
 limiter.init_app(app)
 cache.init_app(app)
 
-# Create tables on startup if they don't exist
-with app.app_context():
-    try:
+# Derive the AES key at import so gunicorn --preload derives it once in the
+# master and forked workers inherit it
+get_encryption(app.config['SECRET_KEY'])
+
+# Tables are created once before the server boots (`flask init-db`, run by
+# scripts/prestart.sh), not by every worker; development keeps the convenience
+if IS_DEV:
+    with app.app_context():
         db.create_all()
-        app.logger.info("Database tables verified.")
-    except Exception as e:
-        app.logger.error(f"Error creating database tables: {e}")
+
+
+# Heads of the migration history before indexes moved into migrations; a schema
+# that `init-db` built without stamping it matches these revisions
+_UNSTAMPED_SCHEMA_REVISIONS = ('a8d1f81691ba', 'c3a1f5b8d920')
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """
+    Prepare the schema for `flask db upgrade` (scripts/prestart.sh runs both).
+    A fresh database gets every table from the models and is stamped at the
+    latest migration; an existing, unstamped one is stamped at the revision
+    its tables match, so upgrade only applies what it lacks.
+    """
+    inspector = sa_inspect(db.engine)
+    if not inspector.has_table('polls'):
+        db.create_all()
+        migrate_stamp(revision='head')
+        app.logger.info("Database tables created and stamped at the latest migration.")
+        return
+    
+    db.create_all()
+    if not inspector.has_table('alembic_version'):
+        migrate_stamp(revision=_UNSTAMPED_SCHEMA_REVISIONS)
+        app.logger.info("Existing database stamped; run `flask db upgrade` to apply new migrations.")
+    app.logger.info("Database tables verified.")
 
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
 
+# Path prefix of the JSON API, also used to pick JSON error responses
+_API_PREFIX = '/api/'
+
 # Register Blueprints
 from blueprints.auth import auth_bp
 from blueprints.dashboard import dashboard_bp
@@ -58,11 +100,11 @@ from blueprints.main import main_bp
 app.register_blueprint(auth_bp)
 app.register_blueprint(dashboard_bp)
 app.register_blueprint(polls_bp)
-app.register_blueprint(api_bp, url_prefix='/api')
+app.register_blueprint(api_bp, url_prefix=_API_PREFIX.rstrip('/'))
 app.register_blueprint(main_bp)
 
 # Production Logging
-if os.getenv('FLASK_ENV') != 'development':
+if not IS_DEV:
     # Configure logging to stdout for container/PaaS environments
     formatter = logging.Formatter(
         '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
@@ -79,6 +121,24 @@ if os.getenv('FLASK_ENV') != 'development':
     app.logger.info('Pollivu starting up in production mode...')
 
 
+# Static URLs carry the file's mtime (?v=...), so the long SEND_FILE_MAX_AGE_DEFAULT
+# is safe: a deploy changes the URL of every edited asset. Read once per process
+@functools.lru_cache(maxsize=None)
+def _static_version(filename):
+    try:
+        return int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+    except OSError:
+        return None
+
+
+@app.url_defaults
+def _add_static_version(endpoint, values):
+    if endpoint == 'static' and 'v' not in values:
+        version = _static_version(values.get('filename', ''))
+        if version is not None:
+            values['v'] = version
+
+
 # Session setup
 @app.before_request
 def setup_session():
@@ -87,32 +147,21 @@ def setup_session():
         session.permanent = True
 
 
-# Security headers middleware
-@app.after_request
-def add_security_headers(response):
-    """Add comprehensive security headers to all responses."""
-    # Prevent clickjacking attacks
-    response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-    
-    # Prevent MIME type sniffing
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    
-    # Enable XSS filter in browsers
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    
-    # Control referrer information
-    response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-    
-    # Permissions policy (restrict sensitive APIs)
-    response.headers['Permissions-Policy'] = 'geolocation=(), microphone=(), camera=()'
-    
-    # Content Security Policy - prevent XSS and data injection
+# One timestamp per request, shared by every view that needs "now"
+@app.before_request
+def _bind_now():
+    g.now = datetime.now(timezone.utc)
+
+
+# Security headers — built once at import, applied on every response
+def _build_csp():
+    """Build the Content Security Policy header value."""
     # Allow Ollama localhost in dev only
     connect_src = "'self' https://cdnjs.cloudflare.com https://cdn.jsdelivr.net"
-    if os.getenv('FLASK_ENV') == 'development':
+    if IS_DEV:
         connect_src += " http://localhost:11434"
     
-    csp = (
+    return (
         "default-src 'self'; "
         "script-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdnjs.cloudflare.com https://cdn.jsdelivr.net; "
         "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://fonts.gstatic.com; "
@@ -123,18 +172,58 @@ def add_security_headers(response):
         "form-action 'self'; "
         "base-uri 'self'"
     )
-    response.headers['Content-Security-Policy'] = csp
-    
-    # Only add HSTS in production (HTTPS only)
-    if os.getenv('FLASK_ENV') == 'production':
-        response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-    
-    # Prevent caching of sensitive pages
-    if request.path in ['/login', '/register', '/settings', '/dashboard']:
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-    
+
+
+_STATIC_HEADERS = {
+    # Prevent clickjacking attacks
+    'X-Frame-Options': 'SAMEORIGIN',
+    # Prevent MIME type sniffing
+    'X-Content-Type-Options': 'nosniff',
+    # Enable XSS filter in browsers
+    'X-XSS-Protection': '1; mode=block',
+    # Control referrer information
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    # Permissions policy (restrict sensitive APIs)
+    'Permissions-Policy': 'geolocation=(), microphone=(), camera=()',
+    # Content Security Policy - prevent XSS and data injection
+    'Content-Security-Policy': _build_csp(),
+}
+
+# Only add HSTS in production (HTTPS only)
+if IS_PROD:
+    _STATIC_HEADERS['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
+
+# Embeddable views set their own framing policy (CSP frame-ancestors, no X-Frame-Options)
+_FRAMEABLE_ENDPOINTS = frozenset({'polls.embed_poll'})
+_FRAMEABLE_HEADERS = {
+    name: value for name, value in _STATIC_HEADERS.items()
+    if name not in ('X-Frame-Options', 'Content-Security-Policy')
+}
+
+# Prevent caching of sensitive pages
+_NOCACHE_PATHS = frozenset({'/login', '/register', '/settings', '/dashboard'})
+_NOCACHE_HEADERS = {
+    'Cache-Control': 'no-store, no-cache, must-revalidate, max-age=0',
+    'Pragma': 'no-cache',
+    'Expires': '0',
+}
+
+
+@app.after_request
+def add_security_headers(response):
+    """Add comprehensive security headers to all responses."""
+    # Static assets (CSS/JS/images) only need nosniff, not the document headers
+    if request.endpoint == 'static':
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        return response
+    # A frameable view's own CSP replaces X-Frame-Options; responses it didn't
+    # produce itself (404s, errors) get the full default set instead
+    if request.endpoint in _FRAMEABLE_ENDPOINTS and 'Content-Security-Policy' in response.headers:
+        response.headers.update(_FRAMEABLE_HEADERS)
+    else:
+        response.headers.update(_STATIC_HEADERS)
+    if request.path in _NOCACHE_PATHS:
+        response.headers.update(_NOCACHE_HEADERS)
     return response
 
 
@@ -144,35 +233,29 @@ def format_time_filter(timedelta_obj):
     return format_time_remaining(timedelta_obj)
 
 
-# Error Handlers — return JSON for API routes, HTML otherwise
+# Error Handlers — HTML pages; the API blueprint registers its own JSON handlers
 @app.errorhandler(404)
 def not_found_error(error):
-    if request.path.startswith('/api/'):
+    # Unrouted /api/ URLs never reach a blueprint, so answer them in JSON here
+    if request.blueprint is None and request.path.startswith(_API_PREFIX):
         return jsonify({'error': 'Not found'}), 404
     return render_template('errors/404.html'), 404
 
 
 @app.errorhandler(403)
 def forbidden_error(error):
-    if request.path.startswith('/api/'):
-        return jsonify({'error': 'Forbidden'}), 403
     return render_template('errors/403.html'), 403
 
 
 @app.errorhandler(500)
 def internal_error(error):
     db.session.rollback()
-    if request.path.startswith('/api/'):
-        return jsonify({'error': 'Internal server error'}), 500
     return render_template('errors/500.html'), 500
 
 
 @app.errorhandler(429)
 def ratelimit_handler(e):
-    if request.path.startswith('/api/'):
-        return jsonify({'error': 'Too many requests'}), 429
     return render_template('429.html'), 429
 
 if __name__ == '__main__':
-    is_dev = os.getenv('FLASK_ENV') == 'development'
-    app.run(debug=is_dev)
+    app.run(debug=IS_DEV)
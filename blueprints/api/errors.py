@@ -0,0 +1,30 @@
+"""
+Pollivu - API Error Handlers
+JSON error responses for routes in the API blueprint.
+HTML error pages for the rest of the app are registered in app.py.
+"""
+
+from extensions import db
+from utils import json_response
+from . import api_bp
+
+
+@api_bp.errorhandler(404)
+def api_not_found(error):
+    return json_response({'error': 'Not found'}, 404)
+
+
+@api_bp.errorhandler(403)
+def api_forbidden(error):
+    return json_response({'error': 'Forbidden'}, 403)
+
+
+@api_bp.errorhandler(500)
+def api_internal_error(error):
+    db.session.rollback()
+    return json_response({'error': 'Internal server error'}, 500)
+
+
+@api_bp.errorhandler(429)
+def api_ratelimit(error):
+    return json_response({'error': 'Too many requests'}, 429)
@@ -5,16 +5,40 @@ poll status, and poll analytics (vote timeline + word cloud).
 """
 
 import logging
-from flask import request, jsonify, current_app
+from functools import lru_cache
+from flask import request, jsonify, current_app, abort
 from flask_login import login_required, current_user
-from extensions import limiter, cache
-from models import Poll
-from ai_service import AIService
-from utils import is_poll_creator
+from sqlalchemy import func, select
+from extensions import db, limiter
+from models import Poll, PollOption, Vote
+from utils import is_poll_creator, json_response, get_ai_service
+from services.view_cache import cached_view
 from . import api_bp
 
 logger = logging.getLogger(__name__)
 
+# Browser-only caching for the polled endpoints (the server-side view cache sits
+# behind this). Not 'public': every response refreshes the session cookie, which
+# a shared proxy must never store and replay to other users
+_POLLED_CACHE_CONTROL = 'private, max-age=5'
+_PRIVATE_CACHE_CONTROL = 'private, max-age=30'
+
+# strftime-style bucket formats for the analytics vote timeline
+_TIME_BUCKET_FORMATS = {
+    'hourly': '%Y-%m-%d %H:00',
+    'daily': '%Y-%m-%d',
+    'cumulative': '%Y-%m-%d',
+}
+
+
+@lru_cache(maxsize=None)
+def _time_bucket_expr(dialect, granularity):
+    """Build (once per dialect/granularity) the SQL expression bucketing Vote.voted_at."""
+    fmt = _TIME_BUCKET_FORMATS.get(granularity, _TIME_BUCKET_FORMATS['hourly'])
+    if dialect == 'mysql':
+        return func.date_format(Vote.voted_at, fmt).label('time_bucket')
+    return func.strftime(fmt, Vote.voted_at).label('time_bucket')
+
 @api_bp.route('/ai/generate', methods=['POST'])
 @login_required
 @limiter.limit("10 per minute")
@@ -31,13 +55,14 @@ def api_ai_generate():
     except (ValueError, TypeError):
         num_options = 4
     style = data.get('style', 'neutral')
+    refresh = bool(data.get('refresh'))
     
     if not topic:
         return jsonify({'error': 'Topic is required'}), 400
     
     try:
-        ai_service = AIService(current_user, current_app.config['SECRET_KEY'])
-        result = ai_service.generate_poll(provider, topic, num_options, style)
+        ai_service = get_ai_service()
+        result = ai_service.generate_poll(provider, topic, num_options, style, refresh=refresh)
         return jsonify({'success': True, 'poll': result})
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -58,13 +83,14 @@ def api_ai_suggest():
     question = data.get('question', '').strip()
     options = data.get('options', [])
     provider = data.get('provider', 'gemini')
+    refresh = bool(data.get('refresh'))
     
     if not question or not options:
         return jsonify({'error': 'Question and options are required'}), 400
     
     try:
-        ai_service = AIService(current_user, current_app.config['SECRET_KEY'])
-        result = ai_service.suggest_improvements(provider, question, options)
+        ai_service = get_ai_service()
+        result = ai_service.suggest_improvements(provider, question, options, refresh=refresh)
         return jsonify({'success': True, 'suggestions': result})
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -75,35 +101,66 @@ def api_ai_suggest():
 
 @api_bp.route('/poll/<poll_id>/live_stats')
 @limiter.limit("60 per minute")
-@cache.cached(timeout=2)
+@cached_view(timeout=2)
 def api_poll_stats(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
+    # Column-only selects: this endpoint is polled constantly, so skip ORM hydration
+    poll_row = db.session.execute(
+        select(Poll.total_votes, Poll.is_closed, Poll.expires_at, Poll.question, Poll.updated_at)
+        .where(Poll.id == poll_id)
+    ).first()
+    if poll_row is None:
+        abort(404)
+    
+    option_rows = db.session.execute(
+        select(PollOption.id, PollOption.option_text, PollOption.vote_count, PollOption.display_order)
+        .where(PollOption.poll_id == poll_id)
+        .order_by(PollOption.display_order)
+    ).all()
+    
+    total_votes = poll_row.total_votes
     # Access: anyone with the poll ID can read live stats (same as the HTML results page)
-    return jsonify({
+    response = json_response({
         'success': True,
         'poll_id': poll_id,
-        'total_votes': poll.total_votes,
-        'is_active': poll.is_active,
-        'is_closed': poll.is_closed,
-        'question': poll.question,
-        'updated_at': poll.updated_at.isoformat() if poll.updated_at else None,
-        'results': [opt.to_dict() for opt in poll.options]
+        'total_votes': total_votes,
+        'is_active': not poll_row.is_closed and not Poll.check_expired(poll_row.expires_at),
+        'is_closed': poll_row.is_closed,
+        'question': poll_row.question,
+        'updated_at': poll_row.updated_at.isoformat() if poll_row.updated_at else None,
+        'results': [{
+            'id': row.id,
+            'option_text': row.option_text,
+            'vote_count': row.vote_count,
+            'percentage': PollOption.compute_percentage(row.vote_count, total_votes),
+            'display_order': row.display_order
+        } for row in option_rows]
     })
+    response.headers['Cache-Control'] = _POLLED_CACHE_CONTROL
+    return response
 
 
 @api_bp.route('/poll/<poll_id>/status')
 @limiter.limit("60 per minute")
-@cache.cached(timeout=10)
+@cached_view(timeout=10)
 def api_poll_status(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
+    row = db.session.execute(
+        select(Poll.is_closed, Poll.expires_at, Poll.total_votes).where(Poll.id == poll_id)
+    ).first()
+    if row is None:
+        abort(404)
+    
+    # Same semantics as Poll.is_expired / Poll.is_active, from the raw columns
+    is_expired = Poll.check_expired(row.expires_at)
     # Access: anyone with the poll ID can read status
-    return jsonify({
+    response = json_response({
         'success': True,
-        'is_active': poll.is_active,
-        'is_closed': poll.is_closed,
-        'is_expired': poll.is_expired,
-        'total_votes': poll.total_votes
+        'is_active': not row.is_closed and not is_expired,
+        'is_closed': row.is_closed,
+        'is_expired': is_expired,
+        'total_votes': row.total_votes
     })
+    response.headers['Cache-Control'] = _POLLED_CACHE_CONTROL
+    return response
 
 
 @api_bp.route('/poll/<poll_id>/analytics')
@@ -118,36 +175,18 @@ def api_poll_analytics(poll_id):
     insights_shared = poll.share_insights is None or poll.share_insights is True
 
     if not is_creator and not is_owner and not insights_shared:
-        return jsonify({'error': 'Unauthorized access'}), 403
+        return json_response({'error': 'Unauthorized access'}, 403)
 
     # Votes over time — supports granularity: hourly (default), daily, cumulative
-    from models import Vote
-    from extensions import db
-    from sqlalchemy import func
-
     granularity = request.args.get('granularity', 'hourly')
 
     timeline_data = []
     if poll.total_votes > 0:
         try:
-            # Detect database dialect for compatible date truncation
-            dialect = db.engine.dialect.name
-
-            if granularity == 'daily' or granularity == 'cumulative':
-                # Group by day
-                if dialect == 'mysql':
-                    time_bucket = func.date_format(Vote.voted_at, '%Y-%m-%d')
-                else:
-                    time_bucket = func.strftime('%Y-%m-%d', Vote.voted_at)
-            else:
-                # Group by hour (default)
-                if dialect == 'mysql':
-                    time_bucket = func.date_format(Vote.voted_at, '%Y-%m-%d %H:00')
-                else:
-                    time_bucket = func.strftime('%Y-%m-%d %H:00', Vote.voted_at)
+            time_bucket = _time_bucket_expr(db.engine.dialect.name, granularity)
 
             results = db.session.query(
-                time_bucket.label('time_bucket'),
+                time_bucket,
                 func.count(Vote.id)
             ).filter(
                 Vote.poll_id == poll_id
@@ -162,7 +201,9 @@ def api_poll_analytics(poll_id):
             current_app.logger.error(f"Analytics Error: {str(e)}")
             timeline_data = []
 
-    return jsonify({
+    response = json_response({
         'success': True,
         'timeline': timeline_data
     })
+    response.headers['Cache-Control'] = _PRIVATE_CACHE_CONTROL
+    return response
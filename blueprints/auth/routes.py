@@ -5,9 +5,8 @@ and session security (regeneration, open redirect prevention).
 """
 
 import logging
-from flask import render_template, redirect, url_for, flash, request, session
+from flask import render_template, redirect, url_for, flash, request, session, g
 from flask_login import login_user, logout_user, login_required, current_user
-from datetime import datetime, timezone
 from extensions import db, limiter
 from models import User
 from forms import RegistrationForm, LoginForm
@@ -25,13 +24,16 @@ def register():
     form = RegistrationForm()
     
     if form.validate_on_submit():
+        # Emails are stored lower-cased, so lookups hit the unique index directly
+        email = form.email.data.lower()
+        
         # Check if email already exists
-        if User.query.filter_by(email=form.email.data.lower()).first():
+        if User.query.filter_by(email=email).first():
             flash('An account with this email already exists.', 'error')
             return render_template('auth/register.html', form=form)
         
         user = User(
-            email=form.email.data.lower(),
+            email=email,
             display_name=form.display_name.data or None
         )
         user.set_password(form.password.data)
@@ -56,10 +58,11 @@ def login():
     form = LoginForm()
     
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data.lower()).first()
+        email = form.email.data.lower()
+        user = User.query.filter_by(email=email).first()
         
         if user and user.check_password(form.password.data):
-            user.last_login = datetime.now(timezone.utc)
+            user.last_login = g.now
             db.session.commit()
             
             # Session regeneration to prevent session fixation attacks
@@ -78,7 +81,7 @@ def login():
             return redirect(next_page or url_for('dashboard.dashboard'))
         
         # Generic error — don't reveal whether the email exists
-        logger.warning(f"Failed login attempt for: {form.email.data.lower()[:5]}***")
+        logger.warning(f"Failed login attempt for: {email[:5]}***")
         flash('Invalid email or password.', 'error')
     
     return render_template('auth/login.html', form=form)
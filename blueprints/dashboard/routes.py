@@ -5,21 +5,72 @@ All routes require authentication via @login_required.
 """
 
 import logging
+from datetime import datetime
 from flask import render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_required, current_user
 from extensions import db
 from models import User, Poll
 from forms import APIKeyForm, UpdateAccountForm
 from ai_service import AIService
+from services.poll_service import PollService
 from . import dashboard_bp
 
 logger = logging.getLogger(__name__)
 
+# (APIKeyForm field, stored key name) pairs saved from the settings page
+_API_KEY_FIELDS = (
+    ('gemini_key', 'gemini'),
+    ('openai_key', 'openai'),
+    ('claude_key', 'claude'),
+    ('gemini_model', 'gemini_model'),
+    ('openai_model', 'openai_model'),
+    ('claude_model', 'claude_model'),
+)
+
+# Polls rendered per dashboard page / "load more" request
+DASHBOARD_PAGE_SIZE = 50
+
+
+def _encode_cursor(cursor):
+    """Serialize a (created_at, id) keyset cursor as 'isoformat,id' (poll ids never contain commas)."""
+    if cursor is None:
+        return None
+    created_at, poll_id = cursor
+    return f"{created_at.isoformat()},{poll_id}"
+
+
+def _decode_cursor(value):
+    """Parse an 'isoformat,id' cursor; raises ValueError if malformed."""
+    created_at, _, poll_id = value.partition(',')
+    if not poll_id:
+        raise ValueError("Cursor is missing the poll id")
+    return datetime.fromisoformat(created_at), poll_id
+
+
 @dashboard_bp.route('/dashboard')
 @login_required
 def dashboard():
-    polls = current_user.polls.order_by(Poll.created_at.desc()).all()
-    return render_template('dashboard.html', polls=polls)
+    polls, next_cursor = PollService.get_user_polls_page(current_user.id, limit=DASHBOARD_PAGE_SIZE)
+    return render_template('dashboard.html', polls=polls, next_cursor=_encode_cursor(next_cursor),
+                           stats=PollService.get_user_poll_stats(current_user.id))
+
+
+@dashboard_bp.route('/dashboard/more')
+@login_required
+def dashboard_more():
+    """Return the next page of poll cards for infinite scroll."""
+    try:
+        before = _decode_cursor(request.args.get('before', ''))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    polls, next_cursor = PollService.get_user_polls_page(current_user.id, before=before,
+                                                         limit=DASHBOARD_PAGE_SIZE)
+    html = ''.join(render_template('components/_poll_card.html', poll=poll) for poll in polls)
+    return jsonify({
+        'html': html,
+        'next_cursor': _encode_cursor(next_cursor)
+    })
 
 
 @dashboard_bp.route('/settings', methods=['GET', 'POST'])
@@ -40,11 +91,12 @@ def settings():
             current_user.display_name = account_form.display_name.data
             
             # Update email if changed (and check uniqueness)
-            if account_form.email.data.lower() != current_user.email:
-                if User.query.filter_by(email=account_form.email.data.lower()).first():
+            new_email = account_form.email.data.lower()
+            if new_email != current_user.email:
+                if User.query.filter_by(email=new_email).first():
                     flash('Email already in use.', 'error')
                     return redirect(url_for('dashboard.settings'))
-                current_user.email = account_form.email.data.lower()
+                current_user.email = new_email
             
             # Update password if provided
             if account_form.new_password.data:
@@ -58,21 +110,15 @@ def settings():
 
     # Handle API Key Update
     if api_form.validate_on_submit() and 'submit_api' in request.form:
-        # Update API keys - only update if new value provided
-        if api_form.gemini_key.data and api_form.gemini_key.data.strip():
-            current_user.set_api_key('gemini', api_form.gemini_key.data.strip(), current_app.config['SECRET_KEY'])
-        if api_form.openai_key.data and api_form.openai_key.data.strip():
-            current_user.set_api_key('openai', api_form.openai_key.data.strip(), current_app.config['SECRET_KEY'])
-        if api_form.claude_key.data and api_form.claude_key.data.strip():
-            current_user.set_api_key('claude', api_form.claude_key.data.strip(), current_app.config['SECRET_KEY'])
+        # Update API keys and model selections - only update if new value provided
+        updates = {}
+        for field_name, key_name in _API_KEY_FIELDS:
+            value = getattr(api_form, field_name).data
+            if value and value.strip():
+                updates[key_name] = value.strip()
         
-        # Save model selections for each provider
-        if api_form.gemini_model.data and api_form.gemini_model.data.strip():
-            current_user.set_api_key('gemini_model', api_form.gemini_model.data.strip(), current_app.config['SECRET_KEY'])
-        if api_form.openai_model.data and api_form.openai_model.data.strip():
-            current_user.set_api_key('openai_model', api_form.openai_model.data.strip(), current_app.config['SECRET_KEY'])
-        if api_form.claude_model.data and api_form.claude_model.data.strip():
-            current_user.set_api_key('claude_model', api_form.claude_model.data.strip(), current_app.config['SECRET_KEY'])
+        # Single encryption pass for all changed values
+        current_user.update_api_keys(updates, current_app.config['SECRET_KEY'])
         
         db.session.add(current_user)
         db.session.commit()
@@ -3,8 +3,7 @@ Pollivu - Main Routes
 Public-facing pages: landing, privacy policy, how-it-works.
 """
 
-from flask import render_template
-from datetime import datetime, timezone
+from flask import render_template, g
 from . import main_bp
 
 @main_bp.route('/')
@@ -14,7 +13,7 @@ def landing():
 
 @main_bp.route('/privacy')
 def privacy():
-    return render_template('privacy.html', now=datetime.now(timezone.utc))
+    return render_template('privacy.html', now=g.now)
 
 
 @main_bp.route('/how-it-works')
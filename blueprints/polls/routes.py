@@ -5,11 +5,14 @@ delete, export CSV, QR code generation, AI suggestions, and embedding.
 """
 
 import logging
+from functools import wraps
 from flask import (render_template, redirect, url_for, flash, request, session, 
-                   jsonify, abort, make_response, current_app)
+                   jsonify, abort, make_response, current_app, Response, send_file)
 from flask_login import login_required, current_user
 import io
 import csv
+import codecs
+import hashlib
 try:
     import qrcode
     QR_AVAILABLE = True
@@ -17,16 +20,50 @@ except ImportError:
     QR_AVAILABLE = False
 
 from extensions import db, limiter, cache, csrf
-from models import User, Poll, PollOption, Vote
+from models import User, Poll, PollOption
 from forms import PollCreationForm, EditPollForm, AIGenerateForm
-from utils import (is_valid_poll_id, generate_voter_token, hash_voter_token,
-                   sanitize_text, is_poll_creator, generate_creator_token, hash_creator_token)
+from utils import (is_valid_poll_id, current_voter_hash,
+                   sanitize_text, is_poll_creator, generate_creator_token, hash_creator_token,
+                   get_ai_service)
 from services.poll_service import PollService
-from ai_service import AIService
 from . import polls_bp
 
 logger = logging.getLogger(__name__)
 
+# QR codes never change for a given poll URL
+QR_CACHE_TIMEOUT = 86400
+
+# CSP for the iframe embed; unlike the site-wide policy, any origin may frame it
+_EMBED_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://fonts.gstatic.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "img-src 'self' data: blob:; "
+    "connect-src 'self'; "
+    "frame-ancestors *; "
+    "form-action 'self'; "
+    "base-uri 'self'"
+)
+
+
+def _poll_owner_required(allow_creator_token=False):
+    """
+    Load the poll once and pass it to the view in place of poll_id.
+    Answers 404 for unknown polls and a JSON 403 unless the current user owns
+    the poll (or, with allow_creator_token, the session holds its creator token).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(poll_id, *args, **kwargs):
+            poll = Poll.query.get_or_404(poll_id)
+            is_owner = current_user.is_authenticated and poll.user_id == current_user.id
+            if not is_owner and not (allow_creator_token and is_poll_creator(poll)):
+                return jsonify({'error': 'Unauthorized'}), 403
+            return view(poll, *args, **kwargs)
+        return wrapper
+    return decorator
+
 
 @polls_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -67,7 +104,7 @@ def create_poll_ai():
     form = AIGenerateForm()
     
     # Get available providers for user
-    ai_service = AIService(current_user, current_app.config['SECRET_KEY'])
+    ai_service = get_ai_service()
     providers = ai_service.get_available_providers()
     
     return render_template('create_poll_ai.html', form=form, providers=providers)
@@ -80,28 +117,25 @@ def view_poll(poll_id):
     if not is_valid_poll_id(poll_id):
         abort(404)
     
-    poll = Poll.query.get_or_404(poll_id)
+    poll = PollService.get_poll_snapshot(poll_id)
+    if poll is None:
+        abort(404)
+    
+    # Check if user already voted
+    voted_option_id = PollService.get_voted_option_id(poll_id, current_voter_hash(poll_id))
     
     # Access Control:
     # "Private" polls are treated as "Unlisted".
     # Anyone with the link (ID) can view the poll.
     # We rely on the secrecy of the 32-char ID.
-    
-    # Check if user already voted
-    voter_token = generate_voter_token(session.get('session_id', ''), poll_id)
-    voter_hash = hash_voter_token(voter_token)
-    existing_vote = Vote.query.filter_by(
-        poll_id=poll_id,
-        voter_token_hash=voter_hash
-    ).first()
 
     is_creator = is_poll_creator(poll) or (current_user.is_authenticated and poll.user_id == current_user.id)
 
     return render_template('poll.html',
                           poll=poll,
                           is_creator=is_creator,
-                          has_voted=existing_vote is not None,
-                          voted_option_id=existing_vote.option_id if existing_vote else None)
+                          has_voted=voted_option_id is not None,
+                          voted_option_id=voted_option_id)
 
 
 @polls_bp.route('/poll/<poll_id>/vote', methods=['POST'])
@@ -147,7 +181,10 @@ def poll_results(poll_id):
     if not is_valid_poll_id(poll_id):
         abort(404)
     
-    poll = Poll.query.get_or_404(poll_id)
+    poll = PollService.get_poll_snapshot(poll_id)
+    if poll is None:
+        abort(404)
+    voted_option_id = PollService.get_voted_option_id(poll_id, current_voter_hash(poll_id))
     
     is_creator = is_poll_creator(poll)
     is_owner = current_user.is_authenticated and poll.user_id == current_user.id
@@ -156,39 +193,24 @@ def poll_results(poll_id):
     # "Private" polls are treated as "Unlisted".
     # Anyone with the link (ID) can view the results.
     
-    voter_token = generate_voter_token(session.get('session_id', ''), poll_id)
-    voter_hash = hash_voter_token(voter_token)
-    existing_vote = Vote.query.filter_by(
-        poll_id=poll_id,
-        voter_token_hash=voter_hash
-    ).first()
-    
     return render_template('results.html',
                           poll=poll,
                           is_creator=is_creator or is_owner,
-                          has_voted=existing_vote is not None,
-                          voted_option_id=existing_vote.option_id if existing_vote else None)
+                          has_voted=voted_option_id is not None,
+                          voted_option_id=voted_option_id)
 
 
 @polls_bp.route('/poll/<poll_id>/close', methods=['POST'])
-def close_poll(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    
-    if not is_poll_creator(poll) and not (current_user.is_authenticated and poll.user_id == current_user.id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
+@_poll_owner_required(allow_creator_token=True)
+def close_poll(poll):
     PollService.close_poll(poll)
     
     return jsonify({'success': True, 'message': 'Poll closed'})
 
 
 @polls_bp.route('/poll/<poll_id>/reopen', methods=['POST'])
-def reopen_poll(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    
-    if not is_poll_creator(poll) and not (current_user.is_authenticated and poll.user_id == current_user.id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
+@_poll_owner_required(allow_creator_token=True)
+def reopen_poll(poll):
     # If the poll has expired, clear expiration so it actually becomes active
     if poll.is_expired:
         poll.expires_at = None
@@ -199,12 +221,8 @@ def reopen_poll(poll_id):
 
 
 @polls_bp.route('/poll/<poll_id>/delete', methods=['POST'])
-def delete_poll(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    
-    if not is_poll_creator(poll) and not (current_user.is_authenticated and poll.user_id == current_user.id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
+@_poll_owner_required(allow_creator_token=True)
+def delete_poll(poll):
     PollService.delete_poll(poll)
     
     # If AJAX request, return JSON
@@ -220,12 +238,8 @@ def delete_poll(poll_id):
 
 @polls_bp.route('/poll/<poll_id>/toggle-public', methods=['POST'])
 @login_required
-def toggle_public(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    
-    if poll.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
+@_poll_owner_required()
+def toggle_public(poll):
     is_public = PollService.toggle_public(poll)
     
     status = 'public' if is_public else 'private'
@@ -294,11 +308,8 @@ def edit_poll(poll_id):
 
 @polls_bp.route('/poll/<poll_id>/option/add', methods=['POST'])
 @login_required
-def add_poll_option(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    if poll.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-        
+@_poll_owner_required()
+def add_poll_option(poll):
     data = request.get_json()
     option_text = sanitize_text(data.get('option_text', ''))
     
@@ -326,38 +337,27 @@ def add_poll_option(poll_id):
 
 @polls_bp.route('/poll/<poll_id>/option/<option_id>/delete', methods=['POST'])
 @login_required
-def delete_poll_option(poll_id, option_id):
-    poll = Poll.query.get_or_404(poll_id)
+@_poll_owner_required()
+def delete_poll_option(poll, option_id):
     option = db.session.get(PollOption, option_id)
     
-    if poll.user_id != current_user.id or not option or option.poll_id != poll.id:
+    if not option or option.poll_id != poll.id:
         return jsonify({'error': 'Unauthorized or Not Found'}), 403
         
-    # Prevent deleting if it's one of the last 2 options?
-    if poll.options.count() <= 2:
-        return jsonify({'error': 'Poll must have at least 2 options'}), 400
-    
-    # Delete votes for this option first to avoid foreign key constraint violation
-    # Also deduct those votes from the poll total
-    poll.total_votes = max(0, poll.total_votes - option.vote_count)
-    Vote.query.filter_by(option_id=option_id).delete()
-    
-    db.session.delete(option)
-    db.session.commit()
+    success, message = PollService.delete_option(poll, option)
+    if not success:
+        return jsonify({'error': message}), 400
     
     return jsonify({'success': True})
 
 
 @polls_bp.route('/poll/<poll_id>/options/suggest', methods=['POST'])
 @login_required
-def suggest_poll_options(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    if poll.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-
+@_poll_owner_required()
+def suggest_poll_options(poll):
     try:
         # Prepare AI service
-        ai = AIService(current_user, current_app.config['SECRET_KEY'])
+        ai = get_ai_service()
         providers = ai.get_available_providers()
         
         if not providers:
@@ -370,7 +370,10 @@ def suggest_poll_options(poll_id):
         existing_options = [opt.option_text for opt in poll.options]
         
         # Use dedicated suggest_new_options which tells the AI what already exists
-        result = ai.suggest_new_options(provider_name, poll.question, existing_options, num_options=4)
+        # Repeat clicks ask for fresh suggestions rather than the cached set
+        refresh = request.args.get('refresh') == '1'
+        result = ai.suggest_new_options(provider_name, poll.question, existing_options,
+                                        num_options=4, refresh=refresh)
         suggestions = result.get('options', [])
         
         # Double-check filter (AI might still repeat some)
@@ -387,27 +390,42 @@ def suggest_poll_options(poll_id):
         return jsonify({'error': str(e)}), 500
 
 
+class _EchoBuffer:
+    """File-like sink that hands each csv.writer row straight back."""
+    
+    def write(self, value):
+        return value
+
+
 @polls_bp.route('/poll/<poll_id>/export/csv')
 def export_csv(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    writer.writerow(['Pollivu Export'])
-    writer.writerow(['Question', poll.question])
-    writer.writerow(['Total Votes', poll.total_votes])
-    writer.writerow([])
-    writer.writerow(['Option', 'Votes', 'Percentage'])
-    
-    for option in poll.options:
-        writer.writerow([option.option_text, option.vote_count, f'{option.percentage}%'])
-    
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename=poll_{poll_id}_results.csv'
+    poll = PollService.get_poll_snapshot(poll_id)
+    if poll is None:
+        abort(404)
     
-    return response
+    # Stream rows as they are written instead of building the whole file first
+    writer = csv.writer(_EchoBuffer())
+    rows = [
+        ['Pollivu Export'],
+        ['Question', poll.question],
+        ['Total Votes', poll.total_votes],
+        [],
+        ['Option', 'Votes', 'Percentage'],
+    ]
+    
+    def generate():
+        # UTF-8 BOM so Excel detects the encoding of non-ASCII option text
+        yield codecs.BOM_UTF8
+        for row in rows:
+            yield writer.writerow(row).encode('utf-8')
+        for option in poll.options:
+            yield writer.writerow([option.option_text, option.vote_count,
+                                   f'{option.percentage}%']).encode('utf-8')
+    
+    # Rows are pre-encoded bytes, so Werkzeug can pass them through untouched
+    return Response(generate(), mimetype='text/csv', direct_passthrough=True, headers={
+        'Content-Disposition': f'attachment; filename=poll_{poll_id}_results.csv'
+    })
 
 
 @polls_bp.route('/poll/<poll_id>/qr')
@@ -415,23 +433,34 @@ def generate_qr(poll_id):
     if not QR_AVAILABLE:
         return jsonify({'error': 'QR code generation not available'}), 501
     
-    poll = Poll.query.get_or_404(poll_id)
+    if PollService.get_poll_snapshot(poll_id) is None:
+        abort(404)
     
     poll_url = request.host_url.rstrip('/') + url_for('polls.view_poll', poll_id=poll_id)
     
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(poll_url)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color='#059669', back_color='white')
-    
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    buffer.seek(0)
-    
-    response = make_response(buffer.getvalue())
-    response.headers['Content-Type'] = 'image/png'
-    response.headers['Content-Disposition'] = f'inline; filename=poll_{poll_id}_qr.png'
+    # The PNG only depends on the URL, so build it once and reuse it; the
+    # same digest doubles as a strong ETag for conditional requests
+    url_digest = hashlib.blake2b(poll_url.encode(), digest_size=16).hexdigest()
+    cache_key = 'qr/' + url_digest
+    png = cache.get(cache_key)
+    if png is None:
+        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+        qr.add_data(poll_url)
+        qr.make(fit=True)
+        
+        img = qr.make_image(fill_color='#059669', back_color='white')
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        png = buffer.getvalue()
+        cache.set(cache_key, png, timeout=QR_CACHE_TIMEOUT)
+    
+    # conditional=True answers a matching If-None-Match with an empty 304
+    response = send_file(io.BytesIO(png), mimetype='image/png',
+                         download_name=f'poll_{poll_id}_qr.png',
+                         etag=url_digest, conditional=True,
+                         max_age=QR_CACHE_TIMEOUT)
+    response.headers['Cache-Control'] = f'public, max-age={QR_CACHE_TIMEOUT}, immutable'
     
     return response
 
@@ -443,31 +472,16 @@ def embed_poll(poll_id):
     if not is_valid_poll_id(poll_id):
         abort(404)
     
-    poll = Poll.query.get_or_404(poll_id)
-    
-    voter_token = generate_voter_token(session.get('session_id', ''), poll_id)
-    voter_hash = hash_voter_token(voter_token)
-    existing_vote = Vote.query.filter_by(
-        poll_id=poll_id,
-        voter_token_hash=voter_hash
-    ).first()
+    poll = PollService.get_poll_snapshot(poll_id)
+    if poll is None:
+        abort(404)
+    voted_option_id = PollService.get_voted_option_id(poll_id, current_voter_hash(poll_id))
     
     response = make_response(render_template('embed_poll.html',
                           poll=poll,
-                          has_voted=existing_vote is not None,
-                          voted_option_id=existing_vote.option_id if existing_vote else None))
-    
-    # Allow this route to be iframed from any origin
-    response.headers.pop('X-Frame-Options', None)
-    response.headers['Content-Security-Policy'] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline'; "
-        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://fonts.gstatic.com; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "img-src 'self' data: blob:; "
-        "connect-src 'self'; "
-        "frame-ancestors *; "
-        "form-action 'self'; "
-        "base-uri 'self'"
-    )
+                          has_voted=voted_option_id is not None,
+                          voted_option_id=voted_option_id))
+    
+    # Allow this route to be iframed from any origin (app.py omits X-Frame-Options)
+    response.headers['Content-Security-Policy'] = _EMBED_CSP
     return response
@@ -7,6 +7,25 @@ All sensitive values are loaded from environment variables.
 import os
 from datetime import timedelta
 
+# Environment values shared by several settings, read once at import
+FLASK_ENV = os.getenv('FLASK_ENV')
+REDIS_URL = os.getenv('REDIS_URL')
+
+# Flask's default instance folder for app.py (holds the SQLite DB and file cache)
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+# Upper bound on pooled Redis connections per worker process
+REDIS_MAX_CONNECTIONS = 50
+
+
+def _with_max_connections(url, max_connections):
+    """Append max_connections to a redis:// URL (redis-py reads it from the query string)."""
+    if not url or 'max_connections=' in url:
+        return url
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}max_connections={max_connections}"
+
+
 class Config:
     """Base configuration class."""
     
@@ -22,17 +41,24 @@ class Config:
     
     if _db_host and _db_user and _db_name:
         SQLALCHEMY_DATABASE_URI = f"mysql+mysqlconnector://{_db_user}:{_db_password}@{_db_host}:{_db_port}/{_db_name}"
+        # One pooled connection per gunicorn thread so I/O-bound API requests never queue on the pool
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': int(os.getenv('GUNICORN_THREADS', '8')),
+            'max_overflow': 4,
+            'pool_pre_ping': True,
+            'pool_recycle': 280,
+        }
     else:
         SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///polls.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Session Cookie Security
-    SESSION_COOKIE_SECURE = os.getenv('FLASK_ENV') == 'production'
+    SESSION_COOKIE_SECURE = FLASK_ENV == 'production'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
-    # Rate Limiting
-    RATELIMIT_STORAGE_URL = os.getenv('REDIS_URL', 'memory://')
+    # Rate Limiting — shared across workers when Redis is available
+    RATELIMIT_STORAGE_URI = REDIS_URL or 'memory://'
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"
     
     # Poll Settings
@@ -50,16 +76,19 @@ class Config:
     MAX_QUESTION_LENGTH = 500
     MAX_OPTION_LENGTH = 200
     
+    # Static assets; safe to cache long because app.py versions static URLs (?v=mtime)
+    SEND_FILE_MAX_AGE_DEFAULT = timedelta(hours=12)
+    
     # Caching
     CACHE_TYPE = 'SimpleCache'  # Default to memory
     CACHE_DEFAULT_TIMEOUT = 300
-    CACHE_REDIS_URL = os.environ.get('REDIS_URL')
+    # Flask-Caching builds its client with redis.from_url, so the pool bound travels in the URL
+    CACHE_REDIS_URL = _with_max_connections(REDIS_URL, REDIS_MAX_CONNECTIONS)
     
     if CACHE_REDIS_URL:
         CACHE_TYPE = 'RedisCache'
 
 
-
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
@@ -70,6 +99,14 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     SESSION_COOKIE_SECURE = True
+    
+    # SimpleCache is per process, so gunicorn workers would neither share hits
+    # nor see each other's invalidations; without Redis fall back to a file
+    # cache the app's workers share. It lives under this app's instance folder
+    # so another app (or test run) on the host can never clear it
+    if not Config.CACHE_REDIS_URL:
+        CACHE_TYPE = 'FileSystemCache'
+        CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(INSTANCE_DIR, 'cache'))
 
 
 config = {
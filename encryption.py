@@ -11,8 +11,15 @@ import logging
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.backends import default_backend
 import json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +32,14 @@ class AES256Encryption:
     - 256-bit key strength (military-grade encryption)
     - GCM mode for authenticated encryption (tamper-proof)
     - Random nonce for each encryption operation
-    - PBKDF2 key derivation from app secret
+    - HKDF key derivation from app secret (legacy PBKDF2 key kept for decryption)
+    
+    SECRET_KEY must be a high-entropy random value; HKDF does not stretch
+    passwords, so a human-chosen secret must be pre-stretched upstream.
     """
     
+    # HKDF context; bump the version to rotate the derived key
+    KDF_INFO = b'pollivu-aes-gcm-v1'
     # AES-256 requires 32-byte (256-bit) key
     KEY_SIZE = 32
     # GCM nonce size (96 bits is recommended)
@@ -50,14 +62,30 @@ class AES256Encryption:
                 self.salt = env_salt.encode('utf-8')
             else:
                 raise ValueError("POLLIVU_SALT environment variable is required for encryption")
+        self._secret_key = secret_key
         self._key = self._derive_key(secret_key)
         self._aesgcm = AESGCM(self._key)
+        self._legacy_aesgcm = None
     
     def _derive_key(self, secret_key: str) -> bytes:
         """
-        Derive a 256-bit key from the secret key using PBKDF2.
+        Derive a 256-bit key from the secret key using HKDF-SHA256.
+        
+        The input is already a random secret, so a single HKDF pass is enough.
+        """
+        kdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=self.KEY_SIZE,
+            salt=self.salt,
+            info=self.KDF_INFO,
+        )
+        return kdf.derive(secret_key.encode())
+    
+    def _derive_legacy_key(self, secret_key: str) -> bytes:
+        """
+        Derive the pre-HKDF key (PBKDF2-SHA256, 100,000 iterations).
         
-        Uses PBKDF2 with SHA-256 and 100,000 iterations for secure key derivation.
+        Only needed to read data encrypted before the switch to HKDF.
         """
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
@@ -68,6 +96,12 @@ class AES256Encryption:
         )
         return kdf.derive(secret_key.encode())
     
+    def _legacy_cipher(self) -> AESGCM:
+        """Get the legacy cipher, deriving its key on first use."""
+        if self._legacy_aesgcm is None:
+            self._legacy_aesgcm = AESGCM(self._derive_legacy_key(self._secret_key))
+        return self._legacy_aesgcm
+    
     def encrypt(self, plaintext: str) -> str:
         """
         Encrypt plaintext using AES-256-GCM.
@@ -80,14 +114,17 @@ class AES256Encryption:
         """
         if not plaintext:
             return ""
-        
+        return self._encrypt_bytes(plaintext.encode('utf-8'))
+    
+    def _encrypt_bytes(self, data: bytes) -> str:
+        """Encrypt raw bytes; returns base64 of nonce + ciphertext."""
         # Generate random nonce for this encryption
         nonce = os.urandom(self.NONCE_SIZE)
         
         # Encrypt data
         ciphertext = self._aesgcm.encrypt(
             nonce,
-            plaintext.encode('utf-8'),
+            data,
             None  # No additional authenticated data
         )
         
@@ -110,7 +147,10 @@ class AES256Encryption:
         """
         if not encrypted:
             return ""
-        
+        return self._decrypt_bytes(encrypted).decode('utf-8')
+    
+    def _decrypt_bytes(self, encrypted: str) -> bytes:
+        """Decrypt base64 nonce + ciphertext to raw bytes."""
         try:
             # Decode base64
             encrypted_data = base64.urlsafe_b64decode(encrypted.encode('utf-8'))
@@ -119,22 +159,32 @@ class AES256Encryption:
             nonce = encrypted_data[:self.NONCE_SIZE]
             ciphertext = encrypted_data[self.NONCE_SIZE:]
             
-            # Decrypt and verify
-            plaintext = self._aesgcm.decrypt(nonce, ciphertext, None)
-            return plaintext.decode('utf-8')
+            # Decrypt and verify; data written before the HKDF switch
+            # only verifies under the legacy key
+            try:
+                plaintext = self._aesgcm.decrypt(nonce, ciphertext, None)
+            except InvalidTag:
+                plaintext = self._legacy_cipher().decrypt(nonce, ciphertext, None)
+            return plaintext
             
         except Exception as e:
             logger.warning(f"Decryption failed — possible data tampering: {e}")
             raise ValueError(f"Decryption failed - data may be tampered: {e}")
     
     def encrypt_dict(self, data: dict) -> str:
-        """Encrypt a dictionary as JSON."""
+        """Encrypt a dictionary as JSON (orjson bytes straight into AES when available)."""
+        if ORJSON_AVAILABLE:
+            return self._encrypt_bytes(orjson.dumps(data))
         return self.encrypt(json.dumps(data))
     
     def decrypt_dict(self, encrypted: str) -> dict:
         """Decrypt to a dictionary from JSON."""
-        decrypted = self.decrypt(encrypted)
-        return json.loads(decrypted) if decrypted else {}
+        if not encrypted:
+            return {}
+        decrypted = self._decrypt_bytes(encrypted)
+        if not decrypted:
+            return {}
+        return orjson.loads(decrypted) if ORJSON_AVAILABLE else json.loads(decrypted)
     
     @staticmethod
     def generate_secure_token(length: int = 32) -> str:
@@ -147,17 +197,19 @@ class AES256Encryption:
         return hashlib.sha256(token.encode()).hexdigest()
 
 
-# Cache instances by secret key to avoid expensive PBKDF2 re-derivation
-# but support multiple keys if needed
+# Cache instances by a digest of the secret key (without keeping the raw secret
+# as a dict key) so each key is derived once per process and its AESGCM cipher
+# is reused; several keys are supported if needed
 _encryption_instances = {}
 
 
 def get_encryption(secret_key: str) -> AES256Encryption:
     """Get or create the encryption singleton for a specific key."""
-    global _encryption_instances
-    if secret_key not in _encryption_instances:
-        _encryption_instances[secret_key] = AES256Encryption(secret_key)
-    return _encryption_instances[secret_key]
+    cache_key = hashlib.sha256(secret_key.encode()).digest()
+    instance = _encryption_instances.get(cache_key)
+    if instance is None:
+        instance = _encryption_instances[cache_key] = AES256Encryption(secret_key)
+    return instance
 
 
 def encrypt_data(data: str, secret_key: str) -> str:
@@ -17,8 +17,7 @@ db = SQLAlchemy()
 migrate = Migrate()
 csrf = CSRFProtect()
 login_manager = LoginManager()
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri="memory://",  # Overridden by RATELIMIT_STORAGE_URL from config
-)
+# Storage comes from RATELIMIT_STORAGE_URI in config (Redis when REDIS_URL is set);
+# a storage_uri passed here would take precedence over it
+limiter = Limiter(key_func=get_remote_address)
 cache = Cache()
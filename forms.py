@@ -9,12 +9,20 @@ from wtforms import (StringField, TextAreaField, SelectField, BooleanField,
                      PasswordField, HiddenField)
 from wtforms.validators import (DataRequired, Length, Email, EqualTo, 
                                  Optional, ValidationError)
+import operator
 import re
+from utils import option_key
 
 
 # ============================================================================
 # Password Validation
 # ============================================================================
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'\d')
+_SPECIAL_RE = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+
+
 def strong_password(form, field):
     """Validate password strength."""
     password = field.data
@@ -22,16 +30,16 @@ def strong_password(form, field):
     if len(password) < 8:
         raise ValidationError('Password must be at least 8 characters long.')
     
-    if not re.search(r'[A-Z]', password):
+    if not _UPPER_RE.search(password):
         raise ValidationError('Password must contain at least one uppercase letter.')
     
-    if not re.search(r'[a-z]', password):
+    if not _LOWER_RE.search(password):
         raise ValidationError('Password must contain at least one lowercase letter.')
     
-    if not re.search(r'\d', password):
+    if not _DIGIT_RE.search(password):
         raise ValidationError('Password must contain at least one number.')
     
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not _SPECIAL_RE.search(password):
         raise ValidationError('Password must contain at least one special character (!@#$%^&*(),.?":{}|<>).')
 
 
@@ -278,32 +286,43 @@ class PollCreationForm(FlaskForm):
     
     is_public = BooleanField('Make poll publicly accessible', default=True)
     
+    # Fetches option_1..option_10 in one C-level call, in display order
+    _OPTION_GETTER = operator.attrgetter(*(f'option_{i}' for i in range(1, 11)))
+    
+    def process(self, *args, **kwargs):
+        """Reload field data, dropping any options computed from the old data."""
+        self._options_cache = None
+        super().process(*args, **kwargs)
+    
     def get_options(self):
-        """Get all non-empty options as a list."""
-        options = []
-        for i in range(1, 11):
-            option = getattr(self, f'option_{i}').data
-            if option and option.strip():
-                options.append(option.strip())
-        return options
+        """Get all non-empty options as a list (computed once per form data)."""
+        if self._options_cache is None:
+            stripped = (field.data.strip() for field in self._OPTION_GETTER(self) if field.data)
+            self._options_cache = [option for option in stripped if option]
+        return self._options_cache
     
     def validate(self, extra_validators=None):
         """Custom validation for the form."""
         if not super().validate(extra_validators):
             return False
         
-        options = self.get_options()
+        # Single pass: remember where each option first appeared and stop at
+        # the first case-insensitive duplicate
+        seen = {}
+        for i, field in enumerate(self._OPTION_GETTER(self), start=1):
+            option = field.data.strip() if field.data else ''
+            if not option:
+                continue
+            key = option_key(option)
+            if key in seen:
+                field.errors.append(f'Duplicate of Option {seen[key]}.')
+                return False
+            seen[key] = i
         
-        if len(options) < 2:
+        if len(seen) < 2:
             self.option_1.errors.append('At least 2 options are required.')
             return False
         
-        # Check for duplicate options
-        unique_options = set(opt.lower() for opt in options)
-        if len(unique_options) != len(options):
-            self.option_1.errors.append('All options must be unique.')
-            return False
-        
         return True
 
 
@@ -6,10 +6,18 @@ Output: PRODUCT_ARCHITECTURE.pdf
 """
 
 import base64
+import functools
 import os
 import re
 import markdown2
-from xhtml2pdf import pisa
+# WeasyPrint lays out and decodes images in C (Cairo/Pango); xhtml2pdf is the
+# pure-Python fallback for machines without those native libraries
+try:
+    from weasyprint import HTML
+    WEASYPRINT_AVAILABLE = True
+except (ImportError, OSError):
+    from xhtml2pdf import pisa
+    WEASYPRINT_AVAILABLE = False
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 MD_FILE = os.path.join(SCRIPT_DIR, "PRODUCT_ARCHITECTURE.md")
@@ -18,7 +26,7 @@ OUTPUT_PDF = os.path.join(SCRIPT_DIR, "PRODUCT_ARCHITECTURE.pdf")
 # ---------------------------------------------------------------------------
 # 1. Embed local images as base64 data URIs
 # ---------------------------------------------------------------------------
-IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"}
+# Image extensions we inline, with their MIME types
 MIME_MAP = {
     ".png": "image/png",
     ".jpg": "image/jpeg",
@@ -28,6 +36,20 @@ MIME_MAP = {
     ".webp": "image/webp",
 }
 
+_IMG_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+_LINK_RE = re.compile(r'<a\s+href="([^"]+)"[^>]*>(.*?)</a>', re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+@functools.lru_cache(maxsize=256)
+def _image_data_uri(img_path: str) -> str:
+    """Read and base64-encode an image once, however often it is referenced."""
+    ext = os.path.splitext(img_path)[1].lower()
+    mime = MIME_MAP.get(ext, "application/octet-stream")
+    with open(img_path, "rb") as f:
+        b64 = base64.b64encode(f.read()).decode()
+    return f"data:{mime};base64,{b64}"
+
 
 def embed_images_in_md(md_text: str) -> str:
     """Replace local image references ![alt](path) with base64 data URIs."""
@@ -36,16 +58,12 @@ def embed_images_in_md(md_text: str) -> str:
         src = match.group(2)
         if src.startswith(("http://", "https://", "data:")):
             return match.group(0)
-        img_path = os.path.join(SCRIPT_DIR, src)
+        img_path = os.path.abspath(os.path.join(SCRIPT_DIR, src))
         if not os.path.isfile(img_path):
             return match.group(0)
-        ext = os.path.splitext(img_path)[1].lower()
-        mime = MIME_MAP.get(ext, "application/octet-stream")
-        with open(img_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-        return f"![{alt}](data:{mime};base64,{b64})"
+        return f"![{alt}]({_image_data_uri(img_path)})"
 
-    return re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", replace_image, md_text)
+    return _IMG_RE.sub(replace_image, md_text)
 
 
 def add_image_references(html_text: str) -> str:
@@ -62,24 +80,21 @@ def add_image_references(html_text: str) -> str:
         if href.startswith(("http://", "https://", "data:", "#")):
             return full
         ext = os.path.splitext(href)[1].lower()
-        if ext not in IMAGE_EXTENSIONS:
+        if ext not in MIME_MAP:
             return full
-        img_path = os.path.join(SCRIPT_DIR, href)
+        img_path = os.path.abspath(os.path.join(SCRIPT_DIR, href))
         if not os.path.isfile(img_path):
             return full
-        mime = MIME_MAP.get(ext, "application/octet-stream")
-        with open(img_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-        clean_label = re.sub(r"<[^>]+>", "", label).strip()
+        clean_label = _TAG_RE.sub("", label).strip()
         return (
             f'<div style="text-align:center;margin:16px 0;">'
             f'<p style="font-size:9pt;color:#6b7280;margin-bottom:6px;"><strong>{clean_label}</strong></p>'
-            f'<img src="data:{mime};base64,{b64}" alt="{clean_label}" '
+            f'<img src="{_image_data_uri(img_path)}" alt="{clean_label}" '
             f'style="max-width:95%;border:1px solid #e5e7eb;border-radius:6px;" />'
             f'</div>'
         )
 
-    return re.sub(r'<a\s+href="([^"]+)"[^>]*>(.*?)</a>', replace_link, html_text, flags=re.DOTALL)
+    return _LINK_RE.sub(replace_link, html_text)
 
 
 # ---------------------------------------------------------------------------
@@ -234,6 +249,9 @@ strong {
 }
 """
 
+# Comments and whitespace stripped once, so xhtml2pdf's CSS parser sees fewer tokens
+_PDF_CSS_MINIFIED = re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", PDF_CSS, flags=re.DOTALL)).strip()
+
 
 # ---------------------------------------------------------------------------
 # 3. Build the PDF
@@ -269,9 +287,7 @@ def main():
 <head>
     <meta charset="utf-8" />
     <title>Pollivu — Product &amp; Architecture Document</title>
-    <style>
-    {PDF_CSS}
-    </style>
+    <style>{_PDF_CSS_MINIFIED}</style>
 </head>
 <body>
 {html_body}
@@ -279,12 +295,15 @@ def main():
 </html>"""
 
     print("📑 Generating PDF ...")
-    with open(OUTPUT_PDF, "wb") as pdf_file:
-        status = pisa.CreatePDF(full_html, dest=pdf_file, encoding="utf-8")
-
-    if status.err:
-        print(f"❌ Error generating PDF: {status.err}")
-        return
+    if WEASYPRINT_AVAILABLE:
+        HTML(string=full_html, base_url=SCRIPT_DIR).write_pdf(OUTPUT_PDF)
+    else:
+        with open(OUTPUT_PDF, "wb") as pdf_file:
+            status = pisa.CreatePDF(full_html, dest=pdf_file, encoding="utf-8")
+
+        if status.err:
+            print(f"❌ Error generating PDF: {status.err}")
+            return
 
     size_kb = os.path.getsize(OUTPUT_PDF) / 1024
     print(f"✅ PDF created: {OUTPUT_PDF}")
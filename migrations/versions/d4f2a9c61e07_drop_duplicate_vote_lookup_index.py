@@ -0,0 +1,27 @@
+"""Drop duplicate vote lookup index
+
+Revision ID: d4f2a9c61e07
+Revises: a8d1f81691ba, c3a1f5b8d920
+Create Date: 2026-10-15 22:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f2a9c61e07'
+down_revision = ('a8d1f81691ba', 'c3a1f5b8d920')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # unique_vote_per_poll already indexes (poll_id, voter_token_hash)
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.drop_index('idx_poll_voter')
+
+
+def downgrade():
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.create_index('idx_poll_voter', ['poll_id', 'voter_token_hash'], unique=False)
@@ -0,0 +1,34 @@
+"""Add dashboard and analytics indexes
+
+Revision ID: e7b3c5d1a042
+Revises: d4f2a9c61e07
+Create Date: 2026-10-15 22:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c5d1a042'
+down_revision = 'd4f2a9c61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.create_index('idx_poll_user_created', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.create_index('idx_vote_poll_time', ['poll_id', 'voted_at'], unique=False)
+        batch_op.create_index('idx_vote_option', ['option_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.drop_index('idx_vote_option')
+        batch_op.drop_index('idx_vote_poll_time')
+
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.drop_index('idx_poll_user_created')
@@ -0,0 +1,26 @@
+"""Add poll expires_at index
+
+Revision ID: f1c6a8e2b953
+Revises: e7b3c5d1a042
+Create Date: 2026-10-15 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6a8e2b953'
+down_revision = 'e7b3c5d1a042'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.create_index('idx_poll_expires', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('polls', schema=None) as batch_op:
+        batch_op.drop_index('idx_poll_expires')
@@ -4,13 +4,20 @@ All sensitive data is encrypted using AES-256-GCM for end-to-end security.
 """
 
 from datetime import datetime, timezone
+from flask import g, has_app_context
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
-from encryption import AES256Encryption, encrypt_dict, decrypt_dict
+from encryption import AES256Encryption, get_encryption, encrypt_dict, decrypt_dict
 from extensions import db
 
 
+def _utc_now():
+    """The request's shared timestamp (g.now) when one is bound, else the current UTC time."""
+    now = g.get('now') if has_app_context() else None
+    return now or datetime.now(timezone.utc)
+
+
 class EncryptedMixin:
     """
     Mixin for models that need AES-256 encrypted fields.
@@ -19,15 +26,15 @@ class EncryptedMixin:
     
     @staticmethod
     def _get_encryptor(secret_key: str) -> AES256Encryption:
-        """Get AES-256 encryption instance."""
-        return AES256Encryption(secret_key)
+        """Get the cached AES-256 encryption instance (key derived once per process)."""
+        return get_encryption(secret_key)
     
     @staticmethod
     def encrypt_field(value: str, secret_key: str) -> str:
         """Encrypt a single field value."""
         if not value:
             return ""
-        return AES256Encryption(secret_key).encrypt(value)
+        return get_encryption(secret_key).encrypt(value)
     
     @staticmethod
     def decrypt_field(encrypted: str, secret_key: str) -> str:
@@ -35,7 +42,7 @@ class EncryptedMixin:
         if not encrypted:
             return ""
         try:
-            return AES256Encryption(secret_key).decrypt(encrypted)
+            return get_encryption(secret_key).decrypt(encrypted)
         except Exception:
             return ""
 
@@ -77,18 +84,44 @@ class User(UserMixin, EncryptedMixin, db.Model):
         """Check if password matches the hash."""
         return check_password_hash(self.password_hash, password)
     
+    @property
+    def _api_keys_cache_name(self):
+        return f'_api_keys_{self.id}'
+    
     def get_api_keys(self, secret_key):
-        """Decrypt and return API keys using AES-256."""
-        if not self._api_keys_encrypted:
-            return {}
-        try:
-            return decrypt_dict(self._api_keys_encrypted, secret_key)
-        except Exception:
-            return {}
+        """
+        Decrypt and return API keys using AES-256 (decrypted once per request).
+        The cache on g is tagged with the ciphertext it came from, so a rollback
+        that restores the stored keys also invalidates it.
+        """
+        encrypted = self._api_keys_encrypted
+        cached = g.get(self._api_keys_cache_name) if has_app_context() else None
+        if cached is not None and cached[0] == encrypted:
+            return dict(cached[1])
+        
+        keys = {}
+        if encrypted:
+            try:
+                keys = decrypt_dict(encrypted, secret_key)
+            except Exception:
+                keys = {}
+        if has_app_context():
+            setattr(g, self._api_keys_cache_name, (encrypted, keys))
+        return dict(keys)
     
     def set_api_keys(self, keys, secret_key):
         """Encrypt and store API keys using AES-256."""
         self._api_keys_encrypted = encrypt_dict(keys, secret_key)
+        if has_app_context():
+            setattr(g, self._api_keys_cache_name, (self._api_keys_encrypted, dict(keys)))
+    
+    def update_api_keys(self, updates, secret_key):
+        """Merge several API key values in a single decrypt/encrypt pass."""
+        if not updates:
+            return
+        keys = self.get_api_keys(secret_key)
+        keys.update(updates)
+        self.set_api_keys(keys, secret_key)
     
     def get_api_key(self, provider, secret_key):
         """Get API key for a specific provider."""
@@ -112,11 +145,6 @@ class User(UserMixin, EncryptedMixin, db.Model):
     def poll_count(self):
         """Get total number of polls created by user."""
         return self.polls.count()
-    
-    @property
-    def total_votes_received(self):
-        """Get total votes across all user's polls."""
-        return sum(poll.total_votes for poll in self.polls)
 
 
 class Poll(EncryptedMixin, db.Model):
@@ -153,8 +181,17 @@ class Poll(EncryptedMixin, db.Model):
     # User ownership (nullable for anonymous polls)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     
+    # Dashboard pages walk a user's polls newest first (keyset on created_at)
+    __table_args__ = (
+        db.Index('idx_poll_user_created', 'user_id', 'created_at'),
+        # Expired-poll cleanup range-scans expires_at < now
+        db.Index('idx_poll_expires', 'expires_at'),
+    )
+    
     # Relationships
-    options = db.relationship('PollOption', backref='poll', lazy='dynamic',
+    # Options are few (at most 10), so load them as a plain list on first
+    # access; votes can be numerous and stay a query
+    options = db.relationship('PollOption', backref='poll', lazy='select',
                               cascade='all, delete-orphan', order_by='PollOption.display_order')
     votes = db.relationship('Vote', backref='poll', lazy='dynamic',
                             cascade='all, delete-orphan')
@@ -178,35 +215,43 @@ class Poll(EncryptedMixin, db.Model):
             self.is_encrypted = True
         self.question = question
     
+    @staticmethod
+    def check_expired(expires_at):
+        """Check whether an expires_at value (naive UTC or aware) has passed."""
+        if expires_at is None:
+            return False
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return _utc_now() > expires_at
+    
     @property
     def is_expired(self):
         """Check if the poll has expired."""
-        if self.expires_at is None:
-            return False
-        expires = self.expires_at
-        if expires.tzinfo is None:
-            expires = expires.replace(tzinfo=timezone.utc)
-        return datetime.now(timezone.utc) > expires
+        return self.check_expired(self.expires_at)
     
     @property
     def is_active(self):
         """Check if the poll is active (not closed and not expired)."""
         return not self.is_closed and not self.is_expired
     
-    @property
-    def time_remaining(self):
-        """Get time remaining until expiration."""
-        if self.expires_at is None:
+    @staticmethod
+    def compute_time_remaining(expires_at):
+        """Get the time left before an expires_at value, or None if none/passed."""
+        if expires_at is None:
             return None
-        now = datetime.now(timezone.utc)
-        expires = self.expires_at
-        if expires.tzinfo is None:
-            expires = expires.replace(tzinfo=timezone.utc)
-        remaining = expires - now
+        now = _utc_now()
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = expires_at - now
         if remaining.total_seconds() < 0:
             return None
         return remaining
     
+    @property
+    def time_remaining(self):
+        """Get time remaining until expiration."""
+        return self.compute_time_remaining(self.expires_at)
+    
     @property
     def public_url(self):
         """Get the public shareable URL path."""
@@ -214,6 +259,7 @@ class Poll(EncryptedMixin, db.Model):
     
     def to_dict(self):
         """Convert poll to dictionary for JSON serialization."""
+        total_votes = self.total_votes
         return {
             'id': self.id,
             'question': self.question,
@@ -229,8 +275,8 @@ class Poll(EncryptedMixin, db.Model):
             'share_insights': self.share_insights,
             'is_expired': self.is_expired,
             'is_active': self.is_active,
-            'total_votes': self.total_votes,
-            'options': [opt.to_dict() for opt in self.options]
+            'total_votes': total_votes,
+            'options': [opt.to_dict(total_votes) for opt in self.options]
         }
 
 
@@ -271,20 +317,31 @@ class PollOption(EncryptedMixin, db.Model):
             self._option_encrypted = self.encrypt_field(text, secret_key)
         self.option_text = text
     
+    @staticmethod
+    def compute_percentage(vote_count, total_votes):
+        """Calculate a vote percentage from raw counts."""
+        if not total_votes:
+            return 0
+        return round((vote_count / total_votes) * 100, 1)
+    
     @property
     def percentage(self):
         """Calculate vote percentage."""
-        if self.poll.total_votes == 0:
-            return 0
-        return round((self.vote_count / self.poll.total_votes) * 100, 1)
-    
-    def to_dict(self):
-        """Convert option to dictionary for JSON serialization."""
+        return self.compute_percentage(self.vote_count, self.poll.total_votes)
+    
+    def to_dict(self, total_votes=None):
+        """
+        Convert option to dictionary for JSON serialization.
+        Pass the poll's total_votes when serializing several options to skip
+        the per-option trip through the poll backref.
+        """
+        if total_votes is None:
+            total_votes = self.poll.total_votes
         return {
             'id': self.id,
             'option_text': self.option_text,
             'vote_count': self.vote_count,
-            'percentage': self.percentage,
+            'percentage': self.compute_percentage(self.vote_count, total_votes),
             'display_order': self.display_order
         }
 
@@ -310,10 +367,14 @@ class Vote(db.Model):
                           nullable=False)
     voted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
-    # Unique constraint: one vote per user per poll
+    # Unique constraint: one vote per user per poll. Its index also serves the
+    # (poll_id, voter_token_hash) "already voted?" lookup as a single seek
     __table_args__ = (
         db.UniqueConstraint('poll_id', 'voter_token_hash', name='unique_vote_per_poll'),
-        db.Index('idx_poll_voter', 'poll_id', 'voter_token_hash'),
+        # Analytics timeline: one poll's votes bucketed by voted_at
+        db.Index('idx_vote_poll_time', 'poll_id', 'voted_at'),
+        # Option deletes remove that option's votes
+        db.Index('idx_vote_option', 'option_id'),
     )
     
     # Relationship to option
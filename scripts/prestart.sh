@@ -0,0 +1,6 @@
+#!/bin/sh
+# Run once per deploy, before gunicorn starts its workers
+set -e
+# Create (and stamp) a fresh schema, then apply any pending migrations
+flask --app app init-db
+flask --app app db upgrade
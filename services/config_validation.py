@@ -5,6 +5,7 @@ Ensures all required environment variables are set before startup.
 import os
 import sys
 import logging
+from config import FLASK_ENV, REDIS_URL
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +32,13 @@ def validate_config():
         sys.exit(1)
         
     # Warn if using default SQLite in production (heuristic)
-    if os.getenv('FLASK_ENV') == 'production' and not os.getenv('DATABASE_URL'):
+    if FLASK_ENV == 'production' and not os.getenv('DATABASE_URL'):
         logger.warning("WARNING: Running in production mode but using default SQLite database.")
+    
+    # Without Redis the cache is per host and rate limits are per worker
+    if FLASK_ENV == 'production' and not REDIS_URL:
+        logger.warning("WARNING: REDIS_URL is not set; using a filesystem cache. "
+                       "Configure Redis to share the cache and rate limits across hosts.")
 
 if __name__ == "__main__":
     validate_config()
@@ -5,13 +5,68 @@ and deleting polls. All mutations are logged for audit trails.
 """
 
 import logging
+from functools import cached_property
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
+from extensions import cache
+from services.view_cache import expire_view
 from models import db, Poll, PollOption, Vote, User
 from utils import (generate_poll_id, generate_creator_token, hash_creator_token, 
-                   generate_voter_token, hash_voter_token, sanitize_text)
+                   generate_voter_token, hash_voter_token, sanitize_text, option_key)
 
 logger = logging.getLogger(__name__)
 
+# Seconds a poll snapshot may be served before it is rebuilt; mutations invalidate it
+SNAPSHOT_TIMEOUT = 60
+
+# Cached API views (services.view_cache) that show a poll's state or counts
+_POLL_VIEW_ENDPOINTS = ('api.api_poll_stats', 'api.api_poll_status')
+
+# Lifetimes offered by the create/edit forms; 'never' (no expiry) is absent on purpose
+EXPIRATION_DELTAS = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+}
+
+
+class OptionSnapshot:
+    """Detached copy of a poll option with the attributes the templates read."""
+    
+    def __init__(self, data, total_votes):
+        self.id = data['id']
+        self.option_text = data['option_text']
+        self.vote_count = data['vote_count']
+        self.display_order = data['display_order']
+        self.percentage = PollOption.compute_percentage(self.vote_count, total_votes)
+
+
+class PollSnapshot:
+    """
+    Detached, cacheable copy of a poll for the public read pages (vote,
+    results, embed, CSV). A snapshot object lives for one request, so the
+    time-dependent flags are computed on first access and then reused.
+    """
+    
+    def __init__(self, data):
+        self.__dict__.update(data)
+        self.options = [OptionSnapshot(option, data['total_votes']) for option in data['options']]
+    
+    @cached_property
+    def is_expired(self):
+        return Poll.check_expired(self.expires_at)
+    
+    @cached_property
+    def is_active(self):
+        return not self.is_closed and not self.is_expired
+    
+    @cached_property
+    def time_remaining(self):
+        return Poll.compute_time_remaining(self.expires_at)
+
 
 class PollService:
     @staticmethod
@@ -24,17 +79,8 @@ class PollService:
         creator_token = generate_creator_token()
         
         # Calculate expiration
-        expires_at = None
-        expiration = form_data.get('expiration')
-        
-        if expiration == '1h':
-            expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
-        elif expiration == '24h':
-            expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
-        elif expiration == '7d':
-            expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-        elif expiration == '30d':
-            expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+        delta = EXPIRATION_DELTAS.get(form_data.get('expiration'))
+        expires_at = datetime.now(timezone.utc) + delta if delta else None
             
         # Create poll
         poll = Poll(
@@ -48,19 +94,20 @@ class PollService:
             user_id=user_id
         )
         
-        # Add options
+        # Options go in as one executemany INSERT rather than one ORM flush per row
         options = form_data.get('options', [])
-        for i, option_text in enumerate(options):
-            if option_text and option_text.strip():
-                option = PollOption(
-                    poll_id=poll_id,
-                    option_text=sanitize_text(option_text),
-                    display_order=i
-                )
-                db.session.add(option)
+        option_rows = [
+            {'poll_id': poll_id, 'option_text': sanitize_text(option_text), 'display_order': i}
+            for i, option_text in enumerate(options)
+            if option_text and option_text.strip()
+        ]
         
         db.session.add(poll)
         try:
+            # The poll row must exist before its options reference it
+            db.session.flush()
+            if option_rows:
+                db.session.execute(insert(PollOption), option_rows)
             db.session.commit()
         except Exception:
             db.session.rollback()
@@ -72,8 +119,127 @@ class PollService:
 
     @staticmethod
     def get_poll(poll_id):
-        """Get poll by ID."""
-        return Poll.query.get(poll_id)
+        """Get poll by ID, with its options joined in the same query."""
+        return db.session.get(Poll, poll_id, options=[joinedload(Poll.options)])
+
+    @staticmethod
+    def get_poll_with_options(poll_id):
+        """
+        Load a poll and its ordered options in a single round trip.
+        Returns: (poll, options), or (None, []) if the poll doesn't exist.
+        """
+        rows = db.session.query(Poll, PollOption).outerjoin(
+            PollOption, PollOption.poll_id == Poll.id
+        ).filter(
+            Poll.id == poll_id
+        ).order_by(
+            PollOption.display_order
+        ).all()
+        
+        if not rows:
+            return None, []
+        return rows[0][0], [option for _, option in rows if option is not None]
+
+    @staticmethod
+    @cache.memoize(timeout=SNAPSHOT_TIMEOUT)
+    def _snapshot_data(poll_id):
+        poll, options = PollService.get_poll_with_options(poll_id)
+        if poll is None:
+            return None
+        return {
+            'id': poll.id,
+            'question': poll.question,
+            'created_at': poll.created_at,
+            'expires_at': poll.expires_at,
+            'allow_vote_change': poll.allow_vote_change,
+            'show_results_before_voting': poll.show_results_before_voting,
+            'is_closed': poll.is_closed,
+            'is_public': poll.is_public,
+            'share_results_chart': poll.share_results_chart,
+            'share_results_list': poll.share_results_list,
+            'share_insights': poll.share_insights,
+            'total_votes': poll.total_votes,
+            'user_id': poll.user_id,
+            'creator_token_hash': poll.creator_token_hash,
+            'options': [{
+                'id': option.id,
+                'option_text': option.option_text,
+                'vote_count': option.vote_count,
+                'display_order': option.display_order,
+            } for option in options]
+        }
+
+    @staticmethod
+    def get_poll_snapshot(poll_id):
+        """
+        Get a cached read-only snapshot of a poll and its options.
+        Returns: PollSnapshot, or None if the poll doesn't exist.
+        """
+        data = PollService._snapshot_data(poll_id)
+        return PollSnapshot(data) if data is not None else None
+
+    @staticmethod
+    def invalidate_snapshot(poll_id):
+        """
+        Drop the cached snapshot after a poll or its options change, and mark
+        the polled status/live_stats views stale so no worker serves old
+        counts or open/closed state.
+        """
+        cache.delete_memoized(PollService._snapshot_data, poll_id)
+        for endpoint in _POLL_VIEW_ENDPOINTS:
+            expire_view(endpoint, poll_id=poll_id)
+
+    @staticmethod
+    def get_voted_option_id(poll_id, voter_hash):
+        """Get the option this voter picked on a poll, or None."""
+        return db.session.execute(
+            select(Vote.option_id).where(Vote.poll_id == poll_id, Vote.voter_token_hash == voter_hash)
+        ).scalar()
+
+    @staticmethod
+    def get_user_polls_page(user_id, before=None, limit=50):
+        """
+        Get one page of a user's polls, newest first, loading only the
+        columns the dashboard cards use. `before` is the (created_at, id) of
+        the last poll on the previous page (keyset pagination); id breaks
+        ties, since created_at is not unique (MySQL DATETIME is whole seconds).
+        Returns: (polls, next_cursor), next_cursor is None on the last page.
+        """
+        query = Poll.query.options(load_only(
+            Poll.id, Poll.question, Poll.created_at, Poll.expires_at,
+            Poll.is_closed, Poll.is_public, Poll.total_votes
+        )).filter(Poll.user_id == user_id)
+        if before is not None:
+            before_created, before_id = before
+            query = query.filter(or_(
+                Poll.created_at < before_created,
+                and_(Poll.created_at == before_created, Poll.id < before_id)
+            ))
+
+        polls = query.order_by(Poll.created_at.desc(), Poll.id.desc()).limit(limit + 1).all()
+        if len(polls) > limit:
+            polls = polls[:limit]
+            return polls, (polls[-1].created_at, polls[-1].id)
+        return polls, None
+
+    @staticmethod
+    def get_user_poll_stats(user_id):
+        """
+        Dashboard totals for a user in one aggregate query.
+        Returns: dict with poll_count, total_votes and active_count
+        """
+        is_active = and_(
+            Poll.is_closed.is_(False),
+            or_(Poll.expires_at.is_(None), Poll.expires_at > datetime.now(timezone.utc))
+        )
+        row = db.session.execute(
+            select(
+                func.count(Poll.id),
+                func.coalesce(func.sum(Poll.total_votes), 0),
+                func.coalesce(func.sum(case((is_active, 1), else_=0)), 0)
+            ).where(Poll.user_id == user_id)
+        ).one()
+        return {'poll_count': row[0], 'total_votes': row[1], 'active_count': row[2]}
 
     @staticmethod
     def vote(poll, option_id, session_id):
@@ -83,68 +249,109 @@ class PollService:
         """
         if not poll.is_active:
             return False, "Poll is no longer active", None
+        # Read before commit: committing expires the instance, and touching
+        # poll.id afterwards would cost a refresh query
+        poll_id = poll.id
             
-        option = PollOption.query.filter_by(id=option_id, poll_id=poll.id).first()
-        if not option:
+        # Options are loaded with the poll (get_poll), so validate in memory
+        if not any(option.id == option_id for option in poll.options):
             return False, "Invalid option", None
             
-        voter_token = generate_voter_token(session_id, poll.id)
+        voter_token = generate_voter_token(session_id, poll_id)
         voter_hash = hash_voter_token(voter_token)
         
-        existing_vote = Vote.query.filter_by(
-            poll_id=poll.id,
-            voter_token_hash=voter_hash
-        ).first()
+        # Column-only probe of the unique (poll_id, voter_token_hash) index
+        old_option_id = PollService.get_voted_option_id(poll_id, voter_hash)
         
-        if existing_vote:
+        if old_option_id is not None:
             if poll.allow_vote_change:
-                # Change vote
-                old_option = PollOption.query.get(existing_vote.option_id)
-                if old_option:
-                    old_option.vote_count = max(0, old_option.vote_count - 1)
+                # Change vote; both counters move in one atomic UPDATE
+                if old_option_id != option_id:
+                    db.session.execute(
+                        update(PollOption).where(PollOption.id.in_((old_option_id, option_id))).values(
+                            vote_count=case(
+                                (PollOption.id == option_id, PollOption.vote_count + 1),
+                                (PollOption.vote_count > 0, PollOption.vote_count - 1),
+                                else_=0
+                            )
+                        )
+                    )
+                    db.session.execute(
+                        update(Vote).where(Vote.poll_id == poll_id, Vote.voter_token_hash == voter_hash)
+                        .values(option_id=option_id)
+                    )
+                    db.session.commit()
+                    PollService.invalidate_snapshot(poll_id)
                 
-                existing_vote.option_id = option_id
-                option.vote_count += 1
-                db.session.commit()
-                
-                logger.info(f"Vote changed on poll {poll.id}: option {existing_vote.option_id} -> {option_id}")
-                return True, "Vote changed successfully", {
-                    'voted_option_id': option_id,
-                    'total_votes': poll.total_votes,
-                    'results': [opt.to_dict() for opt in poll.options]
-                }
+                logger.info(f"Vote changed on poll {poll_id}: option {old_option_id} -> {option_id}")
+                return True, "Vote changed successfully", PollService._vote_results(poll_id, option_id)
             else:
                 return False, "You have already voted", None
         
-        # New vote
+        # New vote: insert plus atomic counter increments in one transaction,
+        # so concurrent votes never read-modify-write the same counters
         vote = Vote(
-            poll_id=poll.id,
+            poll_id=poll_id,
             voter_token_hash=voter_hash,
             option_id=option_id
         )
         
-        option.vote_count += 1
-        poll.total_votes += 1
-        
-        db.session.add(vote)
         try:
+            db.session.add(vote)
+            db.session.execute(
+                update(PollOption).where(PollOption.id == option_id)
+                .values(vote_count=PollOption.vote_count + 1)
+            )
+            db.session.execute(
+                update(Poll).where(Poll.id == poll_id)
+                .values(total_votes=Poll.total_votes + 1)
+            )
             db.session.commit()
+        except IntegrityError:
+            # A concurrent request from the same voter won the unique constraint
+            db.session.rollback()
+            return False, "You have already voted", None
         except Exception:
             db.session.rollback()
-            logger.error(f"Failed to record vote on poll {poll.id}", exc_info=True)
+            logger.error(f"Failed to record vote on poll {poll_id}", exc_info=True)
             raise
+        PollService.invalidate_snapshot(poll_id)
         
-        logger.info(f"New vote on poll {poll.id}: option {option_id} (total: {poll.total_votes})")
-        return True, "Vote recorded", {
-            'voted_option_id': option_id,
-            'total_votes': poll.total_votes,
-            'results': [opt.to_dict() for opt in poll.options]
+        result = PollService._vote_results(poll_id, option_id)
+        logger.info(f"New vote on poll {poll_id}: option {option_id} (total: {result['total_votes']})")
+        return True, "Vote recorded", result
+
+    @staticmethod
+    def _vote_results(poll_id, voted_option_id):
+        """
+        Fresh counts after a vote, read with one joined column-only select
+        (no ORM hydration; the rows are serialized straight into dicts).
+        """
+        rows = db.session.execute(
+            select(Poll.total_votes, PollOption.id, PollOption.option_text,
+                   PollOption.vote_count, PollOption.display_order)
+            .join(PollOption, PollOption.poll_id == Poll.id)
+            .where(Poll.id == poll_id)
+            .order_by(PollOption.display_order)
+        ).all()
+        total_votes = rows[0].total_votes if rows else 0
+        return {
+            'voted_option_id': voted_option_id,
+            'total_votes': total_votes,
+            'results': [{
+                'id': row.id,
+                'option_text': row.option_text,
+                'vote_count': row.vote_count,
+                'percentage': PollOption.compute_percentage(row.vote_count, total_votes),
+                'display_order': row.display_order
+            } for row in rows]
         }
 
     @staticmethod
     def edit_poll(poll, form_data):
         """Update poll settings and expiration."""
-        poll.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        poll.updated_at = now
         poll.question = sanitize_text(form_data.get('question'))
         poll.allow_vote_change = form_data.get('allow_vote_change')
         poll.show_results_before_voting = form_data.get('show_results_before_voting')
@@ -158,14 +365,8 @@ class PollService:
         if expiration != 'current':
             if expiration == 'never':
                 poll.expires_at = None
-            elif expiration == '1h':
-                poll.expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
-            elif expiration == '24h':
-                poll.expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
-            elif expiration == '7d':
-                poll.expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-            elif expiration == '30d':
-                poll.expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+            elif expiration in EXPIRATION_DELTAS:
+                poll.expires_at = now + EXPIRATION_DELTAS[expiration]
                 
         try:
             db.session.commit()
@@ -173,6 +374,7 @@ class PollService:
             db.session.rollback()
             logger.error(f"Failed to edit poll {poll.id}", exc_info=True)
             raise
+        PollService.invalidate_snapshot(poll.id)
         
         logger.info(f"Poll edited: {poll.id}")
         return True, "Poll settings updated successfully."
@@ -185,34 +387,74 @@ class PollService:
         if not option_text or len(option_text) > 200:
             return False, "Invalid option text"
             
-        if poll.options.count() >= 10:
+        existing_options = poll.options
+        if len(existing_options) >= 10:
             return False, "Maximum 10 options allowed"
 
         # Check dupes
-        existing_options = poll.options.all() 
-        if any(opt.option_text.lower() == option_text.lower() for opt in existing_options):
+        new_key = option_key(option_text)
+        if any(option_key(opt.option_text) == new_key for opt in existing_options):
             return False, "Option already exists"
             
-        max_order = 0
-        if existing_options:
-            max_order = max(opt.display_order for opt in existing_options)
-            
+        max_order = max((opt.display_order for opt in existing_options), default=0)
+        
+        # Read before commit, which would otherwise cost a refresh of the poll
+        poll_id = poll.id
         new_option = PollOption(
-            poll_id=poll.id, 
+            poll_id=poll_id, 
             option_text=option_text,
             display_order=max_order + 1
         )
         db.session.add(new_option)
         db.session.commit()
+        PollService.invalidate_snapshot(poll_id)
         
         return True, new_option  # Return the actual option object
 
+    @staticmethod
+    def delete_option(poll, option):
+        """
+        Delete an option and its votes, keeping at least 2 options.
+        The option-count guard runs inside the UPDATE so it's enforced by the DB.
+        Returns: (success, message)
+        """
+        option_count = select(func.count(PollOption.id)).where(
+            PollOption.poll_id == poll.id
+        ).scalar_subquery()
+        # Deduct this option's votes from the poll total, read in the same
+        # statement: the in-memory vote_count may be stale under concurrent votes
+        option_votes = func.coalesce(
+            select(PollOption.vote_count).where(PollOption.id == option.id).scalar_subquery(), 0
+        )
+        result = db.session.execute(
+            update(Poll).where(Poll.id == poll.id, option_count > 2).values(
+                total_votes=case((Poll.total_votes > option_votes,
+                                  Poll.total_votes - option_votes), else_=0)
+            )
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            return False, "Poll must have at least 2 options"
+        
+        # Delete votes for this option first to avoid foreign key constraint violation
+        db.session.execute(delete(Vote).where(Vote.option_id == option.id))
+        db.session.execute(delete(PollOption).where(PollOption.id == option.id))
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.error(f"Failed to delete option {option.id} from poll {poll.id}", exc_info=True)
+            raise
+        PollService.invalidate_snapshot(poll.id)
+        return True, "Option deleted"
+
     @staticmethod
     def toggle_public(poll):
         """Toggle public/private status."""
         poll.is_public = not poll.is_public
         poll.updated_at = datetime.now(timezone.utc)
         db.session.commit()
+        PollService.invalidate_snapshot(poll.id)
         return poll.is_public
 
     @staticmethod
@@ -221,6 +463,7 @@ class PollService:
         poll.is_closed = True
         poll.updated_at = datetime.now(timezone.utc)
         db.session.commit()
+        PollService.invalidate_snapshot(poll.id)
         logger.info(f"Poll closed: {poll.id}")
     
     @staticmethod
@@ -229,6 +472,7 @@ class PollService:
         poll.is_closed = False
         poll.updated_at = datetime.now(timezone.utc)
         db.session.commit()
+        PollService.invalidate_snapshot(poll.id)
         logger.info(f"Poll reopened: {poll.id}")
         
     @staticmethod
@@ -238,6 +482,7 @@ class PollService:
         try:
             db.session.delete(poll)
             db.session.commit()
+            PollService.invalidate_snapshot(poll_id)
             logger.info(f"Poll deleted: {poll_id}")
         except Exception:
             db.session.rollback()
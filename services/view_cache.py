@@ -0,0 +1,72 @@
+"""
+Pollivu - View Cache
+Response caching for hot, frequently polled endpoints with stampede
+protection: entries are served fresh until a soft expiry, after which a
+single worker recomputes them (guarded by a cache.add lock) while
+concurrent requests keep receiving the stale copy. The lock is only exact
+where cache.add is atomic (RedisCache, or SimpleCache within one process);
+FileSystemCache checks then writes, so two workers may occasionally both
+recompute an entry, which costs duplicate work but never serves wrong data.
+Use RedisCache (REDIS_URL) to share entries across gunicorn workers.
+"""
+
+import time
+from functools import wraps
+from flask import request
+from extensions import cache
+
+
+def _view_key(key_prefix, endpoint, view_args):
+    """
+    Cache key for one endpoint and its URL arguments. Built from the route, not
+    the request path, so it doesn't depend on SCRIPT_ROOT or URL spelling.
+    """
+    args = '&'.join(f'{name}={value}' for name, value in sorted(view_args.items()))
+    return f'{key_prefix}/{endpoint}?{args}'
+
+
+def cached_view(timeout, grace=30, lock_timeout=5, key_prefix='view'):
+    """
+    Cache a view's return value per endpoint and URL arguments.
+
+    Args:
+        timeout: Seconds the entry is considered fresh
+        grace: Extra seconds a stale entry may be served while it is refreshed
+        lock_timeout: Seconds the refresh lock is held at most
+        key_prefix: Prefix for the cache key
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = _view_key(key_prefix, request.endpoint, kwargs)
+            entry = cache.get(key)
+            if entry is not None:
+                value, soft_expiry = entry
+                if time.time() < soft_expiry:
+                    return value
+                # Stale: only the worker that wins the lock recomputes
+                if not cache.add(f'lock/{key}', 1, timeout=lock_timeout):
+                    return value
+
+            try:
+                value = f(*args, **kwargs)
+                cache.set(key, (value, time.time() + timeout), timeout=timeout + grace)
+            finally:
+                if entry is not None:
+                    cache.delete(f'lock/{key}')
+            return value
+
+        return decorated_function
+    return decorator
+
+
+def expire_view(endpoint, key_prefix='view', **view_args):
+    """
+    Mark a cached view as stale so the next request on any worker refreshes
+    it. The stale value is kept, so the refresh still goes through the lock.
+    Takes the same endpoint and URL arguments as url_for.
+    """
+    key = _view_key(key_prefix, endpoint, view_args)
+    entry = cache.get(key)
+    if entry is not None:
+        cache.set(key, (entry[0], 0), timeout=30)
@@ -6,45 +6,60 @@ Must be called within a Flask application context.
 
 import logging
 from datetime import datetime, timezone
-from models import db, Poll
+from sqlalchemy import and_, case, delete, func, or_, select
+from models import db, Poll, PollOption, Vote
+from services.poll_service import PollService
 
 logger = logging.getLogger(__name__)
 
 
+# Expired polls deleted per set-based DELETE round (bounds the IN-list size)
+CLEANUP_BATCH_SIZE = 500
+
+
 def cleanup_expired_polls():
     """
     Delete polls that have passed their expiration date.
     Must be called within a Flask app context.
     """
     now = datetime.now(timezone.utc)
-    expired_polls = Poll.query.filter(
-        Poll.expires_at.isnot(None),
-        Poll.expires_at < now
+    # Resolve the ids first so the deleted polls' cached snapshots and views
+    # can be invalidated; otherwise they keep being served until their TTL
+    expired_ids = db.session.scalars(
+        select(Poll.id).where(Poll.expires_at.isnot(None), Poll.expires_at < now)
     ).all()
     
-    count = len(expired_polls)
-    
-    for poll in expired_polls:
-        db.session.delete(poll)
+    count = 0
+    for start in range(0, len(expired_ids), CLEANUP_BATCH_SIZE):
+        batch = expired_ids[start:start + CLEANUP_BATCH_SIZE]
+        # Set-based deletes, children first: SQLite only honours ON DELETE CASCADE
+        # with PRAGMA foreign_keys enabled, so don't rely on it
+        db.session.execute(delete(Vote).where(Vote.poll_id.in_(batch)))
+        db.session.execute(delete(PollOption).where(PollOption.poll_id.in_(batch)))
+        count += db.session.execute(delete(Poll).where(Poll.id.in_(batch))).rowcount
     
     db.session.commit()
+    for poll_id in expired_ids:
+        PollService.invalidate_snapshot(poll_id)
     
     logger.info(f"Cleaned up {count} expired polls")
     return count
 
 
 def get_poll_stats():
-    """Get statistics about all polls."""
-    total_polls = Poll.query.count()
-    active_polls = Poll.query.filter(
-        Poll.is_closed == False,
-        db.or_(
-            Poll.expires_at.is_(None),
-            Poll.expires_at > datetime.now(timezone.utc)
+    """Get statistics about all polls, counted in one aggregate query."""
+    is_active = and_(
+        Poll.is_closed.is_(False),
+        or_(Poll.expires_at.is_(None), Poll.expires_at > datetime.now(timezone.utc))
+    )
+    row = db.session.execute(
+        select(
+            func.count(Poll.id),
+            func.coalesce(func.sum(case((is_active, 1), else_=0)), 0)
         )
-    ).count()
+    ).one()
     
     return {
-        'total_polls': total_polls,
-        'active_polls': active_polls
+        'total_polls': row[0],
+        'active_polls': row[1]
     }
@@ -5,22 +5,79 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# The engine is built when app.py calls db.init_app, so the test database has
+# to be chosen before the import; overriding app.config afterwards is too late
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+from sqlalchemy import event
+from flask_sqlalchemy.session import Session
 from app import app, db
+from extensions import cache
 from models import User, Poll
 
-@pytest.fixture
-def test_app():
-    # Configure app for testing
+# Without REDIS_URL the production config uses a FileSystemCache; tests get a
+# private in-process cache so cache.clear() never touches a shared directory
+app.config['CACHE_TYPE'] = 'SimpleCache'
+cache.init_app(app)
+
+
+class _ConnectionBoundSession(Session):
+    """Session pinned to the per-test connection (Flask-SQLAlchemy would pick the engine)."""
+
+    def get_bind(self, *args, **kwargs):
+        return self.bind
+
+
+@pytest.fixture(scope='session')
+def _schema():
+    # Configure app for testing; the schema is created once for the whole run
     app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['WTF_CSRF_ENABLED'] = False  # Disable CSRF for testing
-    
+
     with app.app_context():
+        engine = db.engine
+
+        # pysqlite defers BEGIN and so breaks SAVEPOINT; let SQLAlchemy emit it
+        @event.listens_for(engine, 'connect')
+        def _disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _emit_begin(conn):
+            conn.exec_driver_sql('BEGIN')
+
+        # The in-memory database lives on its single pooled connection, which
+        # predates the listeners, so recycle it before building the schema
+        engine.dispose()
         db.create_all()
-        yield app
-        db.session.remove()
+    yield
+    with app.app_context():
         db.drop_all()
 
+
+@pytest.fixture
+def test_app(_schema):
+    # Each test runs inside one outer transaction that is rolled back at
+    # teardown; service-level commits only release savepoints within it
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        session = db._make_scoped_session({
+            'class_': _ConnectionBoundSession,
+            'bind': connection,
+            'join_transaction_mode': 'create_savepoint',
+        })
+        original_session, db.session = db.session, session
+        try:
+            yield app
+        finally:
+            db.session = original_session
+            session.remove()
+            transaction.rollback()
+            connection.close()
+            # Memoized snapshots would otherwise outlive the rows they describe
+            cache.clear()
+
 @pytest.fixture
 def client(test_app):
     return test_app.test_client()
@@ -23,7 +23,7 @@ def test_create_poll(test_app, db_session):
     
     assert poll is not None
     assert poll.question == 'Test Poll?'
-    assert poll.options.count() == 2
+    assert len(poll.options) == 2
     assert token is not None
     
     # Verify DB persistence
@@ -41,7 +41,7 @@ def test_vote_poll(test_app, db_session):
     }
     poll, _ = PollService.create_poll(form_data)
     
-    option_id = poll.options.first().id
+    option_id = poll.options[0].id
     session_id = 'test_session_id'
     
     success, message, result = PollService.vote(poll, option_id, session_id)
@@ -73,3 +73,135 @@ def test_reopen_poll(test_app, db_session):
     
     PollService.reopen_poll(poll)
     assert poll.is_closed is False
+
+def test_get_poll_with_options(test_app, db_session):
+    """Test loading a poll and its ordered options together."""
+    form_data = {'question': 'Load Me', 'options': ['First', 'Second', 'Third']}
+    poll, _ = PollService.create_poll(form_data)
+    
+    loaded, options = PollService.get_poll_with_options(poll.id)
+    
+    assert loaded.id == poll.id
+    assert [opt.option_text for opt in options] == ['First', 'Second', 'Third']
+    assert PollService.get_poll_with_options('missing-poll-id') == (None, [])
+
+def test_get_user_polls_page(test_app, db_session):
+    """Test keyset pagination of a user's polls."""
+    from datetime import datetime, timedelta
+    from models import User
+    user = User(email='pager@example.com', password_hash='x')
+    db_session.add(user)
+    db_session.commit()
+    
+    base = datetime(2026, 1, 1)
+    for i in range(5):
+        poll, _ = PollService.create_poll({'question': f'Poll {i}', 'options': ['A', 'B']}, user_id=user.id)
+        poll.created_at = base + timedelta(minutes=i)
+    db_session.commit()
+    
+    first, cursor = PollService.get_user_polls_page(user.id, limit=3)
+    assert [p.question for p in first] == ['Poll 4', 'Poll 3', 'Poll 2']
+    assert cursor == (first[-1].created_at, first[-1].id)
+    
+    rest, cursor = PollService.get_user_polls_page(user.id, before=cursor, limit=3)
+    assert [p.question for p in rest] == ['Poll 1', 'Poll 0']
+    assert cursor is None
+    assert PollService.get_user_poll_stats(user.id) == {'poll_count': 5, 'total_votes': 0, 'active_count': 5}
+
+def test_get_user_polls_page_equal_timestamps(test_app, db_session):
+    """Test that polls sharing a created_at are neither skipped nor repeated across pages."""
+    from datetime import datetime
+    from models import User
+    user = User(email='ties@example.com', password_hash='x')
+    db_session.add(user)
+    db_session.commit()
+    
+    same_second = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(5):
+        poll, _ = PollService.create_poll({'question': f'Poll {i}', 'options': ['A', 'B']}, user_id=user.id)
+        poll.created_at = same_second
+    db_session.commit()
+    
+    seen = []
+    polls, cursor = PollService.get_user_polls_page(user.id, limit=2)
+    seen.extend(p.id for p in polls)
+    while cursor is not None:
+        polls, cursor = PollService.get_user_polls_page(user.id, before=cursor, limit=2)
+        seen.extend(p.id for p in polls)
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+def test_poll_snapshot_invalidated_on_vote(test_app, db_session):
+    """Test that the cached poll snapshot is refreshed after a vote."""
+    poll, _ = PollService.create_poll({'question': 'Cached?', 'options': ['Yes', 'No']})
+    option_id = poll.options[0].id
+    
+    snapshot = PollService.get_poll_snapshot(poll.id)
+    assert snapshot.question == 'Cached?'
+    assert [o.option_text for o in snapshot.options] == ['Yes', 'No']
+    assert snapshot.total_votes == 0
+    
+    PollService.vote(poll, option_id, 'snapshot_session')
+    snapshot = PollService.get_poll_snapshot(poll.id)
+    assert snapshot.total_votes == 1
+    assert snapshot.options[0].percentage == 100.0
+    assert snapshot.is_active
+
+def test_delete_option_keeps_two(test_app, db_session):
+    """Test deleting options deducts votes and stops at two options."""
+    poll, _ = PollService.create_poll({'question': 'Trim?', 'options': ['A', 'B', 'C']})
+    option_a, option_b, _ = poll.options
+    PollService.vote(poll, option_a.id, 'trim_session')
+    
+    success, _ = PollService.delete_option(poll, option_a)
+    assert success is True
+    db_session.refresh(poll)
+    assert poll.total_votes == 0
+    assert len(poll.options) == 2
+    assert Vote.query.filter_by(poll_id=poll.id).count() == 0
+    
+    success, message = PollService.delete_option(poll, option_b)
+    assert success is False
+    assert len(poll.options) == 2
+
+def test_change_vote_moves_counts(test_app, db_session):
+    """Test changing a vote moves the count between options."""
+    poll, _ = PollService.create_poll({'question': 'Change?', 'options': ['A', 'B'],
+                                       'allow_vote_change': True})
+    option_a, option_b = poll.options
+    
+    PollService.vote(poll, option_a.id, 'change_session')
+    success, message, result = PollService.vote(poll, option_b.id, 'change_session')
+    
+    assert success is True
+    assert result['total_votes'] == 1
+    counts = {o['id']: o['vote_count'] for o in result['results']}
+    assert counts == {option_a.id: 0, option_b.id: 1}
+
+def test_cleanup_expired_polls(test_app, db_session):
+    """Test cleanup removes expired polls with their options and votes."""
+    from datetime import datetime, timedelta, timezone
+    from tasks import cleanup_expired_polls
+    expired, _ = PollService.create_poll({'question': 'Old?', 'options': ['A', 'B']})
+    live, _ = PollService.create_poll({'question': 'New?', 'options': ['A', 'B'], 'expiration': '24h'})
+    PollService.vote(expired, expired.options[0].id, 'cleanup_session')
+    expired_id = expired.id
+    expired.expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db_session.commit()
+    PollService.invalidate_snapshot(expired_id)
+    assert PollService.get_poll_snapshot(expired_id) is not None  # now cached
+    
+    assert cleanup_expired_polls() == 1
+    assert PollService.get_poll_snapshot(expired_id) is None
+    assert db_session.get(Poll, expired_id) is None
+    assert PollOption.query.filter_by(poll_id=expired_id).count() == 0
+    assert Vote.query.filter_by(poll_id=expired_id).count() == 0
+    assert db_session.get(Poll, live.id) is not None
+
+def test_extract_json_skips_braces_in_preamble():
+    """Test JSON extraction resumes past a stray {...} in the model's preamble."""
+    from ai_service import _extract_json_object
+    text = 'Here is {your} poll: {"question": "Tea?", "options": ["Yes", "No {maybe}"]} Enjoy!'
+    assert _extract_json_object(text) == {'question': 'Tea?', 'options': ['Yes', 'No {maybe}']}
+    assert _extract_json_object('No {object here') is None
@@ -5,11 +5,25 @@ and session-based creator/voter token management.
 """
 
 import hashlib
+import hmac
 import secrets
 import re
+import unicodedata
 import bleach
-from flask import session
+from flask import session, current_app, jsonify, g
+from flask_login import current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Poll IDs are URL-safe base64 (see generate_poll_id); \Z, unlike $, rejects a trailing newline
+_POLL_ID_RE = re.compile(r'[A-Za-z0-9_-]{8,32}\Z')
+
+# Characters bleach would rewrite: markup/entity delimiters and C0 controls other than \t and \n
+_NEEDS_CLEAN_RE = re.compile(r'[<>&\x00-\x08\x0b-\x1f]')
 
 
 def generate_poll_id(length=16):
@@ -66,14 +80,27 @@ def sanitize_text(text):
     """
     if text is None:
         return ""
+    # Plain text passes through bleach unchanged, so only parse what it would alter
+    if not _NEEDS_CLEAN_RE.search(text):
+        return text.strip()
     return bleach.clean(text, tags=[], strip=True).strip()
 
 
+def option_key(text):
+    """
+    Comparison key for duplicate option checks: NFC-normalized and casefolded.
+    ASCII and already-composed text (the common case) skip the normalize copy.
+    """
+    if not text.isascii() and not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+    return text.casefold()
+
+
 def is_valid_poll_id(poll_id):
     """Check if poll ID matches expected format."""
     if not poll_id:
         return False
-    return bool(re.match(r'^[A-Za-z0-9_-]{8,32}$', poll_id))
+    return bool(_POLL_ID_RE.match(poll_id))
 
 
 def validate_poll_id(poll_id):
@@ -83,7 +110,7 @@ def validate_poll_id(poll_id):
     """
     if not poll_id:
         raise ValueError("Poll ID is required")
-    if not re.match(r'^[A-Za-z0-9_-]{8,32}$', poll_id):
+    if not _POLL_ID_RE.match(poll_id):
         raise ValueError("Invalid poll ID format")
     return poll_id
 
@@ -98,10 +125,9 @@ def format_time_remaining(timedelta_obj):
     if total_seconds < 0:
         return "Expired"
     
-    days = total_seconds // 86400
-    hours = (total_seconds % 86400) // 3600
-    minutes = (total_seconds % 3600) // 60
-    seconds = total_seconds % 60
+    days, remainder = divmod(total_seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
     
     parts = []
     if days > 0:
@@ -117,12 +143,58 @@ def format_time_remaining(timedelta_obj):
 
 
 def is_poll_creator(poll):
-    """Check if current session is the poll creator."""
-    creator_tokens = session.get('creator_tokens', {})
-    stored_token = creator_tokens.get(poll.id)
-    
-    if stored_token:
-        # hash_creator_token is defined in this file, so we can use it directly
-        return hash_creator_token(stored_token) == poll.creator_token_hash
-    
-    return False
+    """
+    Check if current session is the poll creator.
+    Memoized on flask.g per poll and stored token, so a token added to the
+    session later in the same request is checked afresh.
+    """
+    stored_token = session.get('creator_tokens', {}).get(poll.id)
+    if not stored_token:
+        return False
+    results = g.setdefault('_creator_checks', {})
+    key = (poll.id, stored_token)
+    is_creator = results.get(key)
+    if is_creator is None:
+        # Constant-time comparison so the hash check leaks no timing
+        is_creator = results[key] = hmac.compare_digest(
+            hash_creator_token(stored_token), poll.creator_token_hash or '')
+    return is_creator
+
+
+def current_voter_hash(poll_id):
+    """
+    Get the stored voter hash for the current session on a poll.
+    Memoized on flask.g so the double SHA-256 runs once per poll per request.
+    """
+    hashes = g.setdefault('_voter_hashes', {})
+    voter_hash = hashes.get(poll_id)
+    if voter_hash is None:
+        voter_token = generate_voter_token(session.get('session_id', ''), poll_id)
+        voter_hash = hashes[poll_id] = hash_voter_token(voter_token)
+    return voter_hash
+
+
+def get_ai_service():
+    """
+    Get the AIService for the current user, built once per request on flask.g
+    so its decrypted keys and providers are shared by every caller.
+    """
+    ai_service = g.get('_ai_service')
+    if ai_service is None:
+        # Imported here so modules that only need the helpers above (forms)
+        # don't load requests and the shared provider session
+        from ai_service import AIService
+        ai_service = g._ai_service = AIService(current_user, current_app.config['SECRET_KEY'])
+    return ai_service
+
+def json_response(data, status=200):
+    """
+    Build a JSON response, serialized with orjson when available.
+    Used on the frequently polled API endpoints; falls back to jsonify.
+    """
+    if ORJSON_AVAILABLE:
+        return current_app.response_class(orjson.dumps(data), status=status,
+                                          mimetype='application/json')
+    response = jsonify(data)
+    response.status_code = status
+    return response